@@ -1,23 +1,62 @@
-from langchain_groq import ChatGroq
-from .meme_agent import MemeAgent
-from .thread_agent import ThreadAgent
-from .impersonation_agent import ImpersonationAgent
-from .genz_therapist import GenZTherapistAgent
+import importlib
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional
+from utils.llm_gateway import LLMGateway, get_llm_gateway
+
+if TYPE_CHECKING:
+    from .base_agent import BaseAgent
 
 class AgentFactory:
-    def __init__(self, groq_api_key: str):
-        self.llm = ChatGroq(
-            api_key=groq_api_key,
-            model_name="mixtral-8x7b-32768"
-        )
+    """Registry that builds each agent (and its chain) once, on first use"""
+
+    def __init__(self, gateway: Optional[LLMGateway] = None):
+        self.gateway = gateway or get_llm_gateway()
+        # Agent modules import langchain, so they are resolved on first use
         self.agents = {
-            'meme': MemeAgent,
-            'thread': ThreadAgent,
-            'impersonation': ImpersonationAgent,
-            'therapy': GenZTherapistAgent,
-            'default': MemeAgent
+            'meme': 'meme_agent.MemeAgent',
+            'thread': 'thread_agent.ThreadAgent',
+            'impersonation': 'impersonation_agent.ImpersonationAgent',
+            'therapy': 'genz_therapist.GenZTherapistAgent',
+            'fact_check': 'fact_checker.FactCheckerAgent',
+            'sentiment': 'sentiment_agent.SentimentAgent',
+            'default': 'meme_agent.MemeAgent'
         }
+        self._instances: Dict[str, "BaseAgent"] = {}
+        self.stats = {name: {'calls': 0, 'latency_total': 0.0} for name in self.agents}
     
-    def get_agent(self, agent_type: str):
-        agent_class = self.agents.get(agent_type, self.agents['default'])
-        return agent_class(self.llm)
\ No newline at end of file
+    def get_agent(self, agent_type: str) -> "BaseAgent":
+        agent_path = self.agents.get(agent_type, self.agents['default'])
+        agent = self._instances.get(agent_path)
+        if agent is None:
+            module_name, class_name = agent_path.rsplit('.', 1)
+            agent_class = getattr(importlib.import_module(f".{module_name}", __package__), class_name)
+            agent = agent_class(self.gateway)
+            self._instances[agent_path] = agent
+        return agent
+
+    async def process(self, agent_type: str, content: str, **kwargs) -> str:
+        """Run an agent and record its call count and latency"""
+        name = agent_type if agent_type in self.agents else 'default'
+        start = time.monotonic()
+        try:
+            return await self.get_agent(name).process(content, **kwargs)
+        finally:
+            self.stats[name]['calls'] += 1
+            self.stats[name]['latency_total'] += time.monotonic() - start
+
+    async def process_many(self, agent_type: str, contents: List[str], max_concurrency: Optional[int] = None,
+                           **kwargs) -> List[str]:
+        """Run a backlog through one agent's batch path, e.g. for offline evaluation"""
+        name = agent_type if agent_type in self.agents else 'default'
+        start = time.monotonic()
+        try:
+            return await self.get_agent(name).process_many(contents, max_concurrency=max_concurrency, **kwargs)
+        finally:
+            self.stats[name]['calls'] += len(contents)
+            self.stats[name]['latency_total'] += time.monotonic() - start
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {
+            name: dict(stat, avg_latency=stat['latency_total'] / stat['calls'] if stat['calls'] else 0.0)
+            for name, stat in self.stats.items()
+        }
@@ -1,16 +1,52 @@
 from abc import ABC, abstractmethod
-from langchain_groq import ChatGroq
+from typing import Any, Dict, List, Optional
 from langchain.schema.runnable import RunnableSequence
+from utils.llm_gateway import LLMGateway
 
 class BaseAgent(ABC):
-    def __init__(self, llm: ChatGroq):
-        self.llm = llm
+    def __init__(self, gateway: LLMGateway):
+        self.gateway = gateway
+        self.llm = gateway.get_llm()
         self.chain = self._create_chain()
-    
+
     @abstractmethod
     def _create_chain(self) -> RunnableSequence:
         pass
-    
+
+    @abstractmethod
+    def _format(self, response: Any) -> str:
+        """Turn a chain response into the reply text"""
+        pass
+
     @abstractmethod
-    async def process(self, content: str) -> str:
+    def _fallback(self, error: Exception) -> str:
+        """Reply used when the chain fails for an item"""
         pass
+
+    def _inputs(self, content: str, **kwargs) -> Dict[str, Any]:
+        return {"content": content, **kwargs}
+
+    async def process(self, content: str, fallback: bool = True, **kwargs) -> str:
+        """Run the chain; with ``fallback=False`` failures raise instead of returning the fallback reply"""
+        try:
+            response = await self.gateway.run(self.chain.ainvoke, self._inputs(content, **kwargs))
+            return self._format(response)
+        except Exception as e:
+            if not fallback:
+                raise
+            return self._fallback(e)
+
+    async def process_many(self, contents: List[str], max_concurrency: Optional[int] = None, **kwargs) -> List[str]:
+        """Process a backlog through the chain's batch path; results keep input order"""
+        inputs = [self._inputs(content, **kwargs) for content in contents]
+        responses = await self.gateway.batch(self.chain, inputs, max_concurrency)
+        results = []
+        for response in responses:
+            if isinstance(response, Exception):
+                results.append(self._fallback(response))
+                continue
+            try:
+                results.append(self._format(response))
+            except Exception as e:
+                results.append(self._fallback(e))
+        return results
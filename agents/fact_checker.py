@@ -5,19 +5,17 @@ from .base_agent import BaseAgent
 class FactCheckerAgent(BaseAgent):
     def _create_chain(self) -> LLMChain:
         prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are a fact-checking expert. Your job is to:
-            1. Identify the main claim(s)
-            2. Analyze the likelihood of accuracy
-            3. Provide a clear, evidence-based response
-            4. Rate confidence in your assessment
-            Be objective and thorough in your analysis."""),
+            ("system", """You are a fact-checking expert replying on social media. Your job is to:
+            1. Identify the main claim
+            2. Say how likely it is to be accurate, and why, in one or two sentences
+            3. Rate your confidence (low/medium/high)
+            Be objective. Reply with a single post under 250 characters, no headings or lists."""),
             ("user", "Fact check this claim: {content}")
         ])
         return LLMChain(llm=self.llm, prompt=prompt)
     
-    async def process(self, content: str) -> str:
-        try:
-            response = await self.chain.arun(content=content)
-            return f"📊 Fact Check Analysis:\n\n{response}"
-        except Exception as e:
-            return f"Sorry, I couldn't fact check this right now! Error: {str(e)}"
\ No newline at end of file
+    def _format(self, response) -> str:
+        return f"📊 {response[self.chain.output_key].strip()}"
+
+    def _fallback(self, error: Exception) -> str:
+        return "Sorry, I couldn't fact check this right now!"
\ No newline at end of file
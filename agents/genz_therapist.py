@@ -12,12 +12,14 @@ class GenZTherapistAgent(BaseAgent):
         ])
         return prompt | self.llm
     
-    async def process(self, content: str, user_context: str = "") -> str:
-        try:
-            response = await self.chain.ainvoke({
-                "content": content,
-                "user_context": user_context
-            })
-            return response.content.strip()
-        except Exception as e:
-            return "no cap fr fr, having some tech issues rn 😭 give me a sec bestie!"
\ No newline at end of file
+    def _inputs(self, content: str, user_context: str = "") -> dict:
+        return {
+            "content": content,
+            "user_context": user_context
+        }
+
+    def _format(self, response) -> str:
+        return response.content.strip()
+
+    def _fallback(self, error: Exception) -> str:
+        return "no cap fr fr, having some tech issues rn 😭 give me a sec bestie!"
\ No newline at end of file
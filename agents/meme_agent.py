@@ -22,10 +22,9 @@ class MemeAgent(BaseAgent):
         ])
         return prompt | self.llm
     
-    async def process(self, content: str) -> str:
-        try:
-            response = await self.chain.ainvoke({"content": content})
-            # Take only the first response and clean it
-            return response.content.split('\n')[0].strip()
-        except Exception as e:
-            return "Oops! Technical hiccup! Let me try again later 🤖"
\ No newline at end of file
+    def _format(self, response) -> str:
+        # Take only the first response and clean it
+        return response.content.split('\n')[0].strip()
+
+    def _fallback(self, error: Exception) -> str:
+        return "Oops! Technical hiccup! Let me try again later 🤖"
\ No newline at end of file
@@ -5,19 +5,17 @@ from .base_agent import BaseAgent
 class SentimentAgent(BaseAgent):
     def _create_chain(self) -> LLMChain:
         prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are a sentiment analysis expert. Your job is to:
-            1. Analyze the emotional tone
-            2. Identify key sentiments
-            3. Provide a breakdown of emotions detected
-            4. Give an overall sentiment score
-            Be nuanced in your analysis and consider context."""),
+            ("system", """You are a sentiment analysis expert replying on social media. Your job is to:
+            1. Name the overall emotional tone
+            2. Mention the one or two key emotions detected
+            3. Give an overall sentiment score from -1 to 1
+            Be nuanced and consider context. Reply with a single post under 250 characters, no headings or lists."""),
             ("user", "Analyze the sentiment of: {content}")
         ])
         return LLMChain(llm=self.llm, prompt=prompt)
     
-    async def process(self, content: str) -> str:
-        try:
-            response = await self.chain.arun(content=content)
-            return f"🎭 Sentiment Analysis:\n\n{response}"
-        except Exception as e:
-            return f"Sorry, I couldn't analyze the sentiment right now! Error: {str(e)}"
\ No newline at end of file
+    def _format(self, response) -> str:
+        return f"🎭 {response[self.chain.output_key].strip()}"
+
+    def _fallback(self, error: Exception) -> str:
+        return "Sorry, I couldn't analyze the sentiment right now!"
\ No newline at end of file
@@ -16,9 +16,8 @@ class ThreadAgent(BaseAgent):
         ])
         return prompt | self.llm
     
-    async def process(self, content: str) -> str:
-        try:
-            response = await self.chain.ainvoke({"content": content})
-            return response.content.split('\n')[0].strip()
-        except Exception as e:
-            return "Having a brief malfunction! Back soon! 🔧"
\ No newline at end of file
+    def _format(self, response) -> str:
+        return response.content.split('\n')[0].strip()
+
+    def _fallback(self, error: Exception) -> str:
+        return "Having a brief malfunction! Back soon! 🔧"
\ No newline at end of file
@@ -0,0 +1,102 @@
+import random
+import sys
+from typing import Callable, Dict, List
+
+from utils.bandit import ThompsonBandit
+
+# Topic/subtopic arms from ContentManager, without importing the posting model
+TOPICS = {
+    'stress_management': 6, 'mindfulness': 6, 'mental_health_facts': 6, 'self_care': 6,
+    'anxiety_depression': 6, 'sleep_health': 6, 'nutrition_mental_health': 6,
+}
+ARMS = [f"{topic}|{i}" for topic, count in TOPICS.items() for i in range(count)]
+
+
+class LeastUsedPolicy:
+    """The previous selector: least-used topic, uniform subtopic"""
+
+    def __init__(self, arms: List[str], rng: random.Random):
+        self.rng = rng
+        self.by_topic: Dict[str, List[str]] = {}
+        for arm in arms:
+            self.by_topic.setdefault(arm.split('|', 1)[0], []).append(arm)
+        self.usage = {topic: 0 for topic in self.by_topic}
+
+    def select(self) -> str:
+        topic = min(self.usage.items(), key=lambda x: x[1])[0]
+        self.usage[topic] += 1
+        return self.rng.choice(self.by_topic[topic])
+
+    def update(self, arm: str, reward: float):
+        pass
+
+
+class UniformPolicy:
+    def __init__(self, arms: List[str], rng: random.Random):
+        self.arms = arms
+        self.rng = rng
+
+    def select(self) -> str:
+        return self.rng.choice(self.arms)
+
+    def update(self, arm: str, reward: float):
+        pass
+
+
+POLICIES: Dict[str, Callable[[List[str], random.Random], object]] = {
+    'least_used': LeastUsedPolicy,
+    'uniform': UniformPolicy,
+    'thompson': lambda arms, rng: ThompsonBandit(arms, rng=rng),
+}
+
+
+def simulate(policy_name: str, rounds: int, seed: int, target: float = 5, delay: int = 48) -> Dict[str, float]:
+    """Play ``rounds`` posts against synthetic per-arm engagement.
+
+    Each arm has a hidden mean interaction count; a post's interactions
+    are Poisson around it, scaled to a reward the way the bot does, and
+    only fed back ``delay`` posts later (the settle window).
+    """
+    env = random.Random(seed)
+    means = {arm: env.lognormvariate(0.5, 0.8) for arm in ARMS}
+    best = max(means.values())
+
+    rng = random.Random(seed + 1)
+    policy = POLICIES[policy_name](ARMS, rng)
+    pending = []
+    interactions = 0.0
+    regret = 0.0
+    for _ in range(rounds):
+        arm = policy.select()
+        count = _poisson(env, means[arm])
+        interactions += count
+        regret += best - means[arm]
+        pending.append((arm, min(1.0, count / target)))
+        if len(pending) > delay:
+            policy.update(*pending.pop(0))
+    return {'interactions_per_post': interactions / rounds, 'regret_per_post': regret / rounds}
+
+
+def _poisson(rng: random.Random, mean: float) -> int:
+    # Knuth's method; means here are small
+    limit, k, p = pow(2.718281828459045, -mean), 0, 1.0
+    while True:
+        p *= rng.random()
+        if p <= limit:
+            return k
+        k += 1
+
+
+def compare(rounds: int = 2000, seeds: int = 20):
+    print(f"{'policy':<12} {'interactions/post':>18} {'regret/post':>12}   ({rounds} posts, {seeds} seeds)")
+    for name in POLICIES:
+        runs = [simulate(name, rounds, seed) for seed in range(seeds)]
+        interactions = sum(run['interactions_per_post'] for run in runs) / seeds
+        regret = sum(run['regret_per_post'] for run in runs) / seeds
+        print(f"{name:<12} {interactions:>18.2f} {regret:>12.2f}")
+
+
+if __name__ == "__main__":
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    seeds = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    compare(rounds, seeds)
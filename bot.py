@@ -1,15 +1,28 @@
-from atproto import Client, models
-from langchain_groq import ChatGroq
 from datetime import datetime, timezone
 import asyncio
 import logging
-import base64
-import aiohttp
-import requests
+import hashlib
 from typing import Optional, Dict
 from config import get_settings
-import json
 from postingmodel import MentalHealthPostingModel
+from utils.atproto_async import AsyncATProtoClient
+from utils.mention_pipeline import MentionPipeline
+from utils.notification_poller import NotificationPoller
+from utils.uri_store import ProcessedURIStore
+from utils.cache import LRUCache, DiskCache, TieredCache
+from utils.thread_resolver import ThreadContextResolver
+from utils.reply_cache import ReplyCache
+from utils.follow_graph import FollowGraphSync
+from utils.write_batcher import WriteBatcher, WriteRejected
+from utils.session import SessionManager
+from utils.rate_limiter import get_rate_limiter
+from utils.scheduler import JobScheduler
+from utils.prompt_builder import PromptAssembler, relevance
+from utils.engagement import EngagementStore, EngagementCollector
+from utils.text import fit_post
+from nlp.intent_classifier import IntentClassifier
+from agents.agent_factory import AgentFactory
+from utils.llm_gateway import get_llm_gateway
 
 logger = logging.getLogger("bot")
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -17,52 +30,130 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(level
 class TruthTerminalBot:
     def __init__(self):
         self.settings = get_settings()
-        self.client = Client()
-        self.processed_uris = set()
+        # The atproto client is created by _login during initialize()
+        self.client = None
+        self.rate_limiter = get_rate_limiter()
+        self.api = AsyncATProtoClient(
+            None,
+            max_workers=self.settings.ATPROTO_MAX_WORKERS,
+            rate_limiter=self.rate_limiter
+        )
+        self.processed_uris = None
         self.processed_dms = set()
-        self.llm = ChatGroq(api_key=self.settings.GROQ_API_KEY, model_name="mixtral-8x7b-32768")
+        self.llm_gateway = get_llm_gateway()
+        # Everything that reads files or trains on startup is built off the event loop in initialize()
+        self.image_cache = None
+        self._image_inflight = {}
+        self.reply_cache = ReplyCache(
+            maxsize=self.settings.REPLY_CACHE_SIZE,
+            ttl=self.settings.REPLY_CACHE_TTL,
+            vary=self.settings.REPLY_CACHE_VARIATION
+        )
+        self.intent_classifier = None
+        self.agent_factory = AgentFactory(self.llm_gateway)
+        self.prompt_assembler = PromptAssembler(budget=self.settings.PROMPT_TOKEN_BUDGET)
+        self.thread_resolver = ThreadContextResolver(
+            self.api,
+            maxsize=self.settings.THREAD_CACHE_SIZE,
+            ttl=self.settings.THREAD_CACHE_TTL
+        )
+        self.mention_pipeline = MentionPipeline(
+            self._handle_mention,
+            workers=self.settings.MENTION_WORKERS,
+            queue_size=self.settings.MENTION_QUEUE_SIZE
+        )
+        self.notification_poller = None
+        self.follow_graph = None
+        self.scheduler = None
+        self.engagement_store = None
+        self.engagement_collector = None
+        self.session = SessionManager(None, self.settings.BLUESKY_HANDLE, self.settings.BLUESKY_PASSWORD)
         self.bot_did = None
-        self.access_token = None
-        self.refresh_token = None
-        self._login()
-        self._load_processed_uris()
-        # Initialize posting model after login
-        self.posting_model = MentalHealthPostingModel(self)
+        self.write_batcher = WriteBatcher(
+            self.api,
+            self.settings.BLUESKY_HANDLE,
+            batch_size=self.settings.WRITE_BATCH_SIZE,
+            flush_interval=self.settings.WRITE_FLUSH_INTERVAL
+        )
+        self.posting_model = None
+        self._initialized = False
+
+    async def initialize(self):
+        """Log in and load persisted state concurrently once the event loop is running"""
+        if self._initialized:
+            return
+        await asyncio.gather(
+            asyncio.to_thread(self._login),
+            asyncio.to_thread(self._load_processed_uris),
+            asyncio.to_thread(self._load_engagement_store),
+            asyncio.to_thread(self._load_intent_classifier),
+            asyncio.to_thread(self._load_image_cache),
+            asyncio.to_thread(self._load_local_state),
+            asyncio.to_thread(self._load_posting_model)
+        )
+        self._initialized = True
 
     def _login(self):
+        # Imported here so the heavy atproto models load off the event loop
+        from atproto import Client
         try:
-            self.client.login(self.settings.BLUESKY_HANDLE, self.settings.BLUESKY_PASSWORD)
-            session = self.client.com.atproto.server.create_session({
-                "identifier": self.settings.BLUESKY_HANDLE,
-                "password": self.settings.BLUESKY_PASSWORD
-            })
-            self.bot_did = session.did
-            self.access_token = session.access_jwt
-            self.refresh_token = session.refresh_jwt
+            self.client = Client()
+            self.api.client = self.client
+            self.session.client = self.client
+            self.session.login()
+            self.bot_did = self.session.did
+            self.write_batcher.repo = self.bot_did or self.settings.BLUESKY_HANDLE
             logger.info("Login successful")
         except Exception as e:
             logger.error(f"Login failed: {e}")
             raise
 
     def _load_processed_uris(self):
-        try:
-            with open('processed_uris.json', 'r') as f:
-                self.processed_uris = set(json.load(f))
-        except FileNotFoundError:
-            self.processed_uris = set()
-            self._save_processed_uris()
+        self.processed_uris = ProcessedURIStore(ttl_days=self.settings.PROCESSED_URI_TTL_DAYS)
 
-    def _save_processed_uris(self):
-        try:
-            with open('processed_uris.json', 'w') as f:
-                json.dump(list(self.processed_uris), f)
-        except Exception as e:
-            logger.error(f"Error saving URIs: {e}")
+    def _load_engagement_store(self):
+        self.engagement_store = EngagementStore(raw_retention_days=self.settings.ENGAGEMENT_RAW_RETENTION_DAYS)
+        self.engagement_collector = EngagementCollector(
+            self.api,
+            self.engagement_store,
+            min_interval=self.settings.ENGAGEMENT_MIN_POLL,
+            max_interval=self.settings.ENGAGEMENT_MAX_POLL,
+            max_age_days=self.settings.ENGAGEMENT_MAX_AGE_DAYS
+        )
+
+    def _load_intent_classifier(self):
+        self.intent_classifier = IntentClassifier(confidence_threshold=self.settings.INTENT_CONFIDENCE_THRESHOLD)
+
+    def _load_image_cache(self):
+        self.image_cache = TieredCache(
+            LRUCache(maxsize=self.settings.IMAGE_CACHE_SIZE),
+            DiskCache(
+                'image_analysis_cache.db',
+                table='image_analysis',
+                ttl=self.settings.IMAGE_CACHE_DISK_TTL_DAYS * 86400,
+                maxsize=self.settings.IMAGE_CACHE_DISK_SIZE
+            ) if self.settings.IMAGE_CACHE_DISK else None
+        )
+
+    def _load_local_state(self):
+        self.notification_poller = NotificationPoller(
+            self.api,
+            min_interval=self.settings.MENTION_POLL_MIN_INTERVAL,
+            max_interval=self.settings.MENTION_POLL_MAX_INTERVAL
+        )
+        self.follow_graph = FollowGraphSync(
+            self.api,
+            self.settings.BLUESKY_HANDLE,
+            full_resync_every=self.settings.FOLLOW_FULL_RESYNC_CYCLES
+        )
+        self.scheduler = JobScheduler()
+
+    def _load_posting_model(self):
+        self.posting_model = MentalHealthPostingModel(self)
 
     async def create_post(self, text: str, notification):
         try:
-            if len(text) > 280:  # Leave room for safety
-                text = text[:277] + "..."
+            text = fit_post(text, self.settings.POST_GRAPHEME_LIMIT)
             
             created_at = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
             
@@ -81,22 +172,19 @@ class TruthTerminalBot:
                 'createdAt': created_at
             }
 
-            response = self.client.com.atproto.repo.create_record({
-                'repo': self.settings.BLUESKY_HANDLE,
-                'collection': 'app.bsky.feed.post',
-                'record': post
-            })
+            uri = await self.write_batcher.create('app.bsky.feed.post', post)
             
-            return bool(response)
+            return bool(uri)
             
         except Exception as e:
             logger.error(f"Post creation error: {e}")
             return False
 
-    async def _extract_post_context(self, thread):
-        """Extract context from thread including content and images"""
+    async def _extract_post_context(self, resolved):
+        """Extract context from a resolved thread including content and images"""
         context = {
             'parent_post': None,
+            'parent_uri': None,
             'current_post': None,
             'is_reply': False,
             'conversation_context': [],
@@ -104,34 +192,32 @@ class TruthTerminalBot:
         }
         
         try:
-            if hasattr(thread.post.record, 'text'):
-                context['current_post'] = thread.post.record.text
+            post = resolved['post']
+            parent_post = resolved['parent']
+
+            if hasattr(post.record, 'text'):
+                context['current_post'] = post.record.text
             
-            if hasattr(thread.post.record, 'reply'):
+            if getattr(post.record, 'reply', None):
                 context['is_reply'] = True
-                parent_uri = thread.post.record.reply.parent.uri
-                parent_post = self.client.app.bsky.feed.get_posts({'uris': [parent_uri]}).posts[0]
-                if hasattr(parent_post.record, 'text'):
+                context['parent_uri'] = getattr(post.record.reply.parent, 'uri', None)
+                if parent_post is not None and hasattr(parent_post.record, 'text'):
                     context['parent_post'] = parent_post.record.text
-                
-                # Get images from parent post if any
-                parent_images = await self._extract_images(parent_post)
-                if parent_images:
-                    context['images'].extend(parent_images)
             
             # Get conversation context from replies
-            if hasattr(thread, 'replies'):
-                for reply in thread.replies:
-                    if hasattr(reply.post.record, 'text'):
-                        context['conversation_context'].append({
-                            'author': reply.post.author.handle,
-                            'text': reply.post.record.text
-                        })
+            for reply in resolved['replies']:
+                if hasattr(reply.post.record, 'text'):
+                    context['conversation_context'].append({
+                        'author': reply.post.author.handle,
+                        'text': reply.post.record.text,
+                        'indexed_at': getattr(reply.post, 'indexed_at', '') or ''
+                    })
             
-            # Get images from current post
-            current_images = await self._extract_images(thread.post)
-            if current_images:
-                context['images'].extend(current_images)
+            # Get images from parent and current post
+            sources = [parent_post] if context['is_reply'] and parent_post is not None else []
+            sources.append(post)
+            for images in await asyncio.gather(*(self._extract_images(source) for source in sources)):
+                context['images'].extend(images)
                 
         except Exception as e:
             logger.error(f"Error extracting context: {e}")
@@ -144,40 +230,68 @@ class TruthTerminalBot:
         try:
             if hasattr(post.record, 'embed') and hasattr(post.record.embed, 'images'):
                 for img in post.record.embed.images:
+                    blob_ref = getattr(getattr(img, 'image', None), 'ref', None)
                     image_info = {
                         'alt': getattr(img, 'alt', ''),
                         'url': getattr(img, 'fullsize', getattr(img, 'thumb', getattr(img, 'ref', ''))),
+                        'cid': getattr(blob_ref, 'link', blob_ref) or '',
                         'analysis': ''
                     }
                     
-                    if image_info['url']:
-                        analysis_prompt = f"""Analyze this image description and provide relevant context:
-                        Image Alt Text: {image_info['alt']}
-                        
-                        Describe:
-                        1. What is shown in the image
-                        2. Any text visible in the image
-                        3. Key elements or focus points
-                        4. Relevant context for understanding the image
-                        
-                        Keep the analysis concise but informative."""
-
-                        try:
-                            analysis = await self.llm.ainvoke(analysis_prompt)
-                            if analysis and analysis.content:
-                                image_info['analysis'] = analysis.content
-                        except Exception as e:
-                            logger.error(f"Image analysis error: {str(e)}")
-                            image_info['analysis'] = "Unable to analyze image"
-                        
+                    if image_info['url'] or image_info['cid']:
                         images.append(image_info)
+
+                # Cache misses for one post are analyzed concurrently
+                analyses = await asyncio.gather(*(self._analyze_image(info) for info in images))
+                for image_info, analysis in zip(images, analyses):
+                    image_info['analysis'] = analysis
         except Exception as e:
             logger.error(f"Image extraction error: {str(e)}")
         return images
 
+    async def _analyze_image(self, image_info) -> str:
+        """Return a cached image analysis, running the LLM only on a miss"""
+        source = image_info['cid'] or image_info['url']
+        key = hashlib.sha256(f"{source}\x00{image_info['alt']}".encode()).hexdigest()
+        cached = self.image_cache.get(key)
+        if cached is not None:
+            return cached
+
+        # Coalesce concurrent misses for the same image into one LLM call
+        task = self._image_inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._run_image_analysis(image_info['alt']))
+            self._image_inflight[key] = task
+            task.add_done_callback(lambda _: self._image_inflight.pop(key, None))
+        analysis = await asyncio.shield(task)
+
+        if analysis is None:
+            return "Unable to analyze image"
+        self.image_cache.set(key, analysis)
+        return analysis
+
+    async def _run_image_analysis(self, alt_text: str) -> Optional[str]:
+        analysis_prompt = f"""Analyze this image description and provide relevant context:
+        Image Alt Text: {alt_text}
+        
+        Describe:
+        1. What is shown in the image
+        2. Any text visible in the image
+        3. Key elements or focus points
+        4. Relevant context for understanding the image
+        
+        Keep the analysis concise but informative."""
+
+        try:
+            analysis = await self.llm_gateway.ainvoke(analysis_prompt)
+            return analysis.content if analysis and analysis.content else ''
+        except Exception as e:
+            logger.error(f"Image analysis error: {str(e)}")
+            return None
+
     def _create_analysis_prompt(self, context, mention_text):
-        """Create analysis prompt with full context"""
-        prompt = f"""You are Therapy Punch, a Gen-Z mental health advocate who combines street wisdom with therapeutic insight.
+        """Create analysis prompt, fitting ranked context into the token budget"""
+        head = f"""You are Therapy Punch, a Gen-Z mental health advocate who combines street wisdom with therapeutic insight.
         Your style is empathetic, playful, and uses Gen-Z slang naturally while providing genuine mental health value.
         
         CONTEXT:
@@ -186,18 +300,22 @@ class TruthTerminalBot:
         User's mention: {mention_text}
         """
 
-        if context.get('conversation_context'):
-            prompt += "\nConversation history:\n"
-            for msg in context['conversation_context']:
-                prompt += f"{msg['author']}: {msg['text']}\n"
+        # Replies ranked by relevance to the mention, with a bonus for recency
+        replies = context.get('conversation_context', [])
+        newest_first = sorted(range(len(replies)), key=lambda i: replies[i]['indexed_at'], reverse=True)
+        recency = {idx: 1 / (1 + rank) for rank, idx in enumerate(newest_first)}
+        history = [
+            (relevance(msg['text'], mention_text) + 0.5 * recency[idx], f"{msg['author']}: {msg['text']}\n")
+            for idx, msg in enumerate(replies)
+        ]
 
-        if context.get('images'):
-            prompt += "\nImages in the conversation:\n"
-            for idx, img in enumerate(context['images'], 1):
-                prompt += f"Image {idx} description: {img['alt']}\n"
-                prompt += f"Image {idx} analysis: {img['analysis']}\n"
+        # Image analyses describe the post being discussed, so they outrank replies
+        images = [
+            (1.5, f"Image {idx} description: {img['alt']}\nImage {idx} analysis: {img['analysis']}\n")
+            for idx, img in enumerate(context.get('images', []), 1)
+        ]
 
-        prompt += """
+        tail = """
         RESPONSE REQUIREMENTS:
         1. Use Gen-Z therapeutic style (e.g., "bestie", "fr fr", "no cap", etc.)
         2. Keep response under 280 characters
@@ -209,148 +327,217 @@ class TruthTerminalBot:
         Generate a supportive response that addresses their specific concern while maintaining your unique style.
         """
 
+        prompt, _ = self.prompt_assembler.build(head, tail, [
+            ("\nConversation history:\n", history),
+            ("\nImages in the conversation:\n", images)
+        ])
         return prompt
 
-    async def _process_mention(self, notification):
-        """Process mentions with full context analysis"""
+    async def _generate_reply(self, context, mention_text) -> Optional[str]:
+        """Generate a reply, reusing a cached one for near-identical mentions under the same parent"""
+        # Image analyses are part of the context, so they are part of the key; top-level mentions are not cached
+        context_key = None
+        if context.get('parent_uri'):
+            context_key = context['parent_uri'] + ''.join(img['analysis'] for img in context.get('images', []))
+        cached = self.reply_cache.get(context_key, mention_text)
+        if cached:
+            logger.info("Reusing cached reply")
+            return cached
+
+        # Generate analysis prompt
+        prompt = self._create_analysis_prompt(context, mention_text)
+        # Streamed so generation stops as soon as the post limit is reached
+        reply = await self.llm_gateway.astream_text(prompt, self.settings.POST_GRAPHEME_LIMIT)
+        if not reply:
+            return None
+
+        self.reply_cache.set(context_key, mention_text, reply)
+        return reply
+
+    async def _route_mention(self, context, mention_text) -> Optional[str]:
+        """Send specialised requests to their agent; everything else gets the Therapy Punch reply"""
+        intent = await self.intent_classifier.classify(mention_text)
+        if intent.intent != 'therapy' and intent.intent in self.agent_factory.agents:
+            logger.info(f"Routing mention to {intent.intent} agent ({intent.confidence:.2f})")
+            content = mention_text
+            if context.get('parent_post'):
+                content = f"{mention_text}\n\nReplying to: {context['parent_post']}"
+            # Failures raise so nothing is posted and the mention is retried, rather than a fallback going out
+            return await self.agent_factory.process(intent.intent, content, fallback=False)
+        return await self._generate_reply(context, mention_text)
+
+    async def _handle_mention(self, notification):
+        """Pipeline handler: process a mention and report the outcome to the poller's watermark"""
+        try:
+            success = await self._process_mention(notification)
+        except asyncio.CancelledError:
+            # Shutdown is not a failed attempt
+            self.notification_poller.release(notification.uri)
+            raise
+        except Exception as e:
+            logger.error(f"Mention handler error: {e}")
+            success = False
+        self.notification_poller.complete(notification.uri, success)
+
+    async def _process_mention(self, notification) -> bool:
+        """Process mentions with full context analysis; False means retry on a later poll"""
         try:
             thread_uri = notification.uri
             
             if thread_uri in self.processed_uris:
                 logger.info(f"Skipping already processed URI: {thread_uri}")
-                return
+                return True
             
             if not hasattr(notification, 'uri') or not hasattr(notification, 'cid'):
                 logger.error(f"Invalid notification format: missing uri or cid")
-                return
+                return True
             
-            thread = self.client.app.bsky.feed.get_post_thread({'uri': thread_uri}).thread
+            resolved = await self.thread_resolver.resolve(notification)
             
-            if not thread or not hasattr(thread, 'post'):
+            if not resolved:
                 logger.error(f"Could not retrieve thread for URI: {thread_uri}")
-                return
+                return False
             
             # Extract full context
-            context = await self._extract_post_context(thread)
+            context = await self._extract_post_context(resolved)
             mention_text = notification.record.text.replace(f"@{self.settings.BLUESKY_HANDLE}", "").strip()
             
-            # Generate analysis prompt
-            prompt = self._create_analysis_prompt(context, mention_text)
-            
             try:
-                response = await self.llm.ainvoke(prompt)
+                formatted_response = await self._route_mention(context, mention_text)
                 
-                if response and response.content:
+                if formatted_response:
                     # Process response
-                    formatted_response = response.content.strip()
-                    if len(formatted_response) > 280:
-                        formatted_response = formatted_response[:277] + "..."
+                    formatted_response = fit_post(formatted_response, self.settings.POST_GRAPHEME_LIMIT)
                     
                     # Add to processed URIs before posting
                     self.processed_uris.add(thread_uri)
-                    self._save_processed_uris()
                     
                     success = await self.create_post(formatted_response, notification)
                     if success:
                         logger.info(f"Posted reply to {notification.uri}")
-                    else:
-                        # Remove from processed URIs if posting fails
-                        self.processed_uris.remove(thread_uri)
-                        self._save_processed_uris()
-                        logger.error(f"Failed to post reply to {notification.uri}")
+                        return True
+                    # Remove from processed URIs if posting fails
+                    self.processed_uris.discard(thread_uri)
+                    logger.error(f"Failed to post reply to {notification.uri}")
+                return False
                     
             except Exception as e:
                 logger.error(f"Error generating or posting response: {str(e)}")
-                if thread_uri in self.processed_uris:
-                    self.processed_uris.remove(thread_uri)
-                    self._save_processed_uris()
+                self.processed_uris.discard(thread_uri)
+                return False
 
         except Exception as e:
             logger.error(f"Mention processing error: {str(e)}")
+            return False
 
-    async def _check_mentions(self):
-        while True:
-            try:
-                notifications = self.client.app.bsky.notification.list_notifications({
-                    'limit': 20
-                }).notifications
-
-                for notif in notifications:
-                    if notif.reason in ['mention', 'reply'] and notif.uri not in self.processed_uris:
-                        await self._process_mention(notif)
-                        await asyncio.sleep(2)
-                        
-            except Exception as e:
-                logger.error(f"Mention check error: {e}")
-                
-            await asyncio.sleep(30)
+    async def _check_mentions(self) -> float:
+        """Scheduler job: queue new mentions and return the adaptive poll interval"""
+        notifications = []
+        handed_off = 0
+        try:
+            notifications = await self.notification_poller.poll()
+
+            for notif in notifications:
+                if notif.reason in ['mention', 'reply'] and notif.uri not in self.processed_uris:
+                    await self.mention_pipeline.submit(notif)
+                else:
+                    self.notification_poller.complete(notif.uri)
+                handed_off += 1
+
+            # Only moves past notifications that are done; queued and failed ones are polled again
+            await self.notification_poller.mark_seen()
+                    
+        except Exception as e:
+            logger.error(f"Mention check error: {e}")
+        finally:
+            # Claimed but never queued (error or cancellation): return them to the next poll
+            for notif in notifications[handed_off:]:
+                self.notification_poller.release(notif.uri)
+            
+        return self.notification_poller.next_interval(len(notifications))
+
+    async def _refresh_session(self) -> float:
+        """Scheduler job: keep the session fresh and persisted; checks at least every 10 minutes
+        so tokens rotated by the client's own refresh reach session.json promptly"""
+        await self.api.call(self.session.maintain)
+        return min(600.0, self.session.seconds_until_refresh())
+
+    def _register_jobs(self):
+        self.scheduler.add_job('mentions', self._check_mentions, interval=self.settings.MENTION_POLL_MAX_INTERVAL)
+        self.scheduler.add_job('follows', self._handle_follows, interval=self.settings.FOLLOW_INTERVAL, jitter=30)
+        self.scheduler.add_job(
+            'post',
+            self.posting_model.run_scheduled,
+            interval=self.settings.POST_INTERVAL,
+            jitter=self.settings.POST_INTERVAL_JITTER
+        )
+        self.scheduler.add_job(
+            'engagement',
+            self.engagement_collector.collect,
+            interval=self.settings.ENGAGEMENT_INTERVAL
+        )
+        self.scheduler.add_job(
+            'session_refresh',
+            self._refresh_session,
+            interval=600,
+            first_run_in=self.session.seconds_until_refresh(),
+            persist=False
+        )
 
     async def start(self):
         """Main entry point with follow handling"""
+        await self.initialize()
         while True:
             try:
-                # Create tasks for all operations
-                mention_task = asyncio.create_task(self._check_mentions())
-                posting_task = asyncio.create_task(self.posting_model.run())
-                follow_task = asyncio.create_task(self._handle_follows())
-                
-                # Wait for all tasks
-                await asyncio.gather(mention_task, posting_task, follow_task)
+                self.mention_pipeline.start()
+                self._register_jobs()
+
+                # Periodic jobs run from the scheduler; the post buffer fills in the background
+                await asyncio.gather(self.scheduler.run(), self.posting_model.fill_buffer())
                 
             except Exception as e:
                 logger.error(f"Main loop error: {e}")
                 await asyncio.sleep(60)
+            finally:
+                for notification in await self.mention_pipeline.stop():
+                    self.notification_poller.release(notification.uri)
 
-    async def _handle_follows(self):
-        """Handle following back users"""
-        while True:
-            try:
-                # Get current followers
-                followers = self.client.app.bsky.graph.get_followers({
-                    'actor': self.settings.BLUESKY_HANDLE,
-                    'limit': 100
-                }).followers
-
-                # Get accounts we're following
-                following = self.client.app.bsky.graph.get_follows({
-                    'actor': self.settings.BLUESKY_HANDLE,
-                    'limit': 100
-                }).follows
-
-                # Create set of DIDs we're following
-                following_dids = {f.did for f in following}
-
-                # Follow back users who aren't followed
-                for follower in followers:
-                    if follower.did not in following_dids:
-                        try:
-                            await self._follow_user(follower.did)
-                            logger.info(f"Followed back user: {follower.did}")
-                            await asyncio.sleep(2)  # Rate limiting
-                        except Exception as e:
-                            logger.error(f"Error following user {follower.did}: {str(e)}")
-
-                # Wait before next check
-                await asyncio.sleep(300)  # Check every 5 minutes
+    async def _handle_follows(self) -> Optional[float]:
+        """Scheduler job: follow back new followers"""
+        try:
+            pending = await self.follow_graph.sync()
+            # Skips accounts followed from elsewhere since the last full resync, and deleted ones
+            pending = await self.follow_graph.verify(pending)
 
-            except Exception as e:
-                logger.error(f"Follow handler error: {str(e)}")
-                await asyncio.sleep(60)  # Wait 1 minute on error
+            # Follow back users who aren't followed; the write batcher groups these into applyWrites calls
+            results = await asyncio.gather(*(self._follow_user(did) for did in pending))
+            for did, followed in zip(pending, results):
+                if followed:
+                    self.follow_graph.mark_followed(did)
+                    logger.info(f"Followed back user: {did}")
+
+            self.follow_graph.save()
+            return None
+
+        except Exception as e:
+            logger.error(f"Follow handler error: {str(e)}")
+            return 60  # Retry in 1 minute on error
 
     async def _follow_user(self, did: str):
         """Follow a user by their DID"""
         try:
             created_at = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
             
-            self.client.com.atproto.repo.create_record({
-                'repo': self.settings.BLUESKY_HANDLE,
-                'collection': 'app.bsky.graph.follow',
-                'record': {
-                    'subject': did,
-                    'createdAt': created_at
-                }
+            uri = await self.write_batcher.create('app.bsky.graph.follow', {
+                'subject': did,
+                'createdAt': created_at
             })
-            return True
+            return bool(uri)
+        except WriteRejected as e:
+            if 'duplicate' in str(e).lower() or 'already exists' in str(e).lower():
+                return True
+            self.follow_graph.mark_rejected(did)
+            return False
         except Exception as e:
             logger.error(f"Follow error for {did}: {e}")
             return False
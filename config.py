@@ -8,9 +8,53 @@ class Settings(BaseSettings):
     BOT_HANDLE: str
     GROQ_API_KEY: str
     BOT_DID: Optional[str] = None
+    ATPROTO_MAX_WORKERS: int = 8
+    MENTION_WORKERS: int = 4
+    MENTION_QUEUE_SIZE: int = 50
+    MENTION_POLL_MIN_INTERVAL: float = 5
+    MENTION_POLL_MAX_INTERVAL: float = 60
+    PROCESSED_URI_TTL_DAYS: float = 30
+    IMAGE_CACHE_SIZE: int = 512
+    IMAGE_CACHE_DISK: bool = True
+    IMAGE_CACHE_DISK_SIZE: int = 10000
+    IMAGE_CACHE_DISK_TTL_DAYS: float = 30
+    THREAD_CACHE_SIZE: int = 1024
+    THREAD_CACHE_TTL: float = 120
+    REPLY_CACHE_SIZE: int = 512
+    REPLY_CACHE_TTL: float = 1800
+    REPLY_CACHE_VARIATION: bool = True
+    FOLLOW_FULL_RESYNC_CYCLES: int = 288
+    WRITE_BATCH_SIZE: int = 50
+    WRITE_FLUSH_INTERVAL: float = 0.5
+    # Token-bucket budgets shared by all loops (requests or records per second, burst size)
+    RATE_LIMIT_READ_PER_SEC: float = 10
+    RATE_LIMIT_READ_BURST: float = 30
+    RATE_LIMIT_WRITE_PER_SEC: float = 0.45
+    RATE_LIMIT_WRITE_BURST: float = 100
+    RATE_LIMIT_LLM_PER_SEC: float = 0.5
+    RATE_LIMIT_LLM_BURST: float = 5
+    LLM_MAX_CONCURRENCY: int = 4
+    LLM_TIMEOUT: float = 30
+    LLM_MAX_RETRIES: int = 3
+    POST_BUFFER_SIZE: int = 5
+    POST_INTERVAL: float = 1800
+    POST_INTERVAL_JITTER: float = 120
+    FOLLOW_INTERVAL: float = 300
+    PROMPT_TOKEN_BUDGET: int = 1200
+    POST_GRAPHEME_LIMIT: int = 300
+    INTENT_CONFIDENCE_THRESHOLD: float = 0.7
+    ENGAGEMENT_INTERVAL: float = 300
+    ENGAGEMENT_MIN_POLL: float = 300
+    ENGAGEMENT_MAX_POLL: float = 21600
+    ENGAGEMENT_MAX_AGE_DAYS: float = 7
+    ENGAGEMENT_RAW_RETENTION_DAYS: float = 2
+    # A post's engagement is fed to topic selection once it is this old; TARGET interactions count as full reward
+    BANDIT_REWARD_WINDOW_HOURS: float = 24
+    BANDIT_REWARD_TARGET: float = 5
     
     class Config:
         env_file = ".env"
 
+@lru_cache
 def get_settings():
     return Settings()
@@ -0,0 +1,43 @@
+import re
+import subprocess
+import sys
+
+# "import time:      self [us] |  cumulative | imported package"
+_LINE_RE = re.compile(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def measure_imports(module: str = 'bot'):
+    """Import ``module`` in a fresh interpreter with -X importtime and parse the timings"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True,
+        text=True
+    )
+    timings = []
+    for line in result.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            timings.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return timings, result.returncode, result.stderr
+
+
+def import_report(module: str = 'bot', top: int = 20):
+    timings, returncode, stderr = measure_imports(module)
+    if returncode != 0:
+        print(f"Importing {module} failed:")
+        print(stderr.strip().splitlines()[-1] if stderr.strip() else 'no output')
+        return
+
+    # Top-level entries (depth 0) sum to the total import cost
+    total = sum(cumulative for _, _, cumulative, depth in timings if depth == 0)
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for name, self_us, cumulative_us, _ in sorted(timings, key=lambda t: t[2], reverse=True)[:top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name}")
+    print(f"\nimport {module}: {total / 1000:.1f} ms across {len(timings)} modules")
+
+
+if __name__ == "__main__":
+    module = sys.argv[1] if len(sys.argv) > 1 else 'bot'
+    top = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    import_report(module, top)
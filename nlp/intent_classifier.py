@@ -1,22 +1,180 @@
-from langchain_groq import ChatGroq
-from langchain.prompts import ChatPromptTemplate
-from langchain.output_parsers import PydanticOutputParser
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
+from collections import Counter, defaultdict
+import json
 import logging
-from config import get_settings
+import math
+import os
+import re
+from utils.cache import LRUCache
+from utils.llm_gateway import get_llm_gateway
+from utils.text import normalize_text
+
+logger = logging.getLogger("intent_classifier")
+
+FIXTURES_PATH = os.path.join(os.path.dirname(__file__), 'intent_fixtures.json')
+INTENTS = ['meme', 'thread', 'impersonation', 'therapy', 'fact_check', 'sentiment']
+
+# Precompiled fast-path rules, checked in order; (intent, pattern, confidence).
+# Distress cues come first so a struggling user is never routed to a joke or analysis agent.
+RULES = [
+    ('therapy', re.compile(
+        r"\banxi(?:ous|ety)\b|\bdepress|\bpanic\b|\bstress(?:ed|ful)?\b|\blonely\b|\bburn(?:ed|t)? ?out\b|\boverthink"
+        r"|\boverwhelm|\bcan'?t (?:breathe|cope|sleep|stop crying|do this anymore)\b|\bhopeless\b|\bworthless\b"
+        r"|\bhurt(?:ing)? myself\b|\bself harm\b|\bsuicid|\bmental health\b|\btherap(?:y|ist)\b|\bmy feelings\b"
+        r"|\b(?:want(?:s|ed)? to|wanna|gonna|going to|ready to) die\b|\bwish i (?:was|were) dead\b|\bbetter off dead\b"
+        r"|\bkill(?:ing)? my ?self\b|\bkms\b|\bend(?:ing)? (?:my life|it all|everything)\b|\bunaliv"
+        r"|\bdon'?t want to (?:live|be alive|be here|exist)\b|\bdon'?t wanna (?:live|be alive|be here|exist)\b"
+        r"|\bfeel(?:ing)? (?:like )?(?:so |really |such )?(?:a joke|down|sad|bad|lost|empty|alone|numb)\b"), 0.9),
+    ('impersonation', re.compile(
+        r"\b(?:talk|speak|respond|reply|answer|say (?:it|this|that))\s+(?:like|as)\s+(?P<topic>[\w .']{2,40})"
+        r"|\bin the style of\s+(?P<style>[\w .']{2,40})|\bpretend (?:to be|you(?:'re| are))\s+(?P<role>[\w .']{2,40})"
+        r"|\bimpersonat"), 0.95),
+    ('fact_check', re.compile(
+        r"\bfact[- ]?check|\bis (?:this|that|it) (?:true|real|legit|accurate)\b|\bdebunk|\bmisinfo"
+        r"|\bwhat(?:'s|s| is) (?:the|your) sources?\b|\b(?:got|any|need|share|cite|link) (?:a |the |your )?sources?\b"
+        r"|\bsources? (?:for|on) (?:this|that)\b|^sources?$|\bverify (?:this|that|it|the claim)\b"), 0.95),
+    ('meme', re.compile(
+        r"\bmemes?\b|\b(?:tell|make|give)(?: me)? (?:a |some )?jokes?\b|\bmake me laugh\b"
+        r"|\broast (?:this|that|him|her|them|my)\b"), 0.9),
+    ('thread', re.compile(
+        r"\b(?:make|write|start|turn (?:this|it|that) into) (?:a |an )?thread\b|\bthread (?:on|about)\b"
+        r"|\bbreak (?:it|this|that) down\b|\bstep by step\b"), 0.9),
+    ('sentiment', re.compile(r"\bsentiment\b|\bvibe check\b|\bwhat(?:'s| is) the (?:vibe|tone|mood)\b"), 0.9),
+]
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
 
-settings = get_settings()
 
 class IntentClassification(BaseModel):
     intent: str = Field(description="The classified intent of the user's query")
     confidence: float = Field(description="Confidence score of the classification")
     extracted_topic: Optional[str] = Field(description="Main topic or subject extracted from the query")
 
-class IntentClassifier:
-    def __init__(self):
-        self.llm = ChatGroq(
-            api_key=settings.GROQ_API_KEY,
-            model_name="llama-3.2-3b-preview"
+
+def _features(text: str) -> List[str]:
+    tokens = _TOKEN_RE.findall(text)
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+class TfidfCentroidClassifier:
+    """Linear TF-IDF nearest-centroid classifier trained from labelled fixtures"""
+
+    def __init__(self, examples: List[Tuple[str, str]]):
+        docs = [(_features(normalize_text(text)), label) for text, label in examples]
+        df = Counter(feature for features, _ in docs for feature in set(features))
+        n_docs = len(docs)
+        self.idf = {feature: math.log((1 + n_docs) / (1 + count)) + 1 for feature, count in df.items()}
+
+        sums: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        for features, label in docs:
+            for feature, weight in self._vectorize(features).items():
+                sums[label][feature] += weight
+        self.centroids = {label: self._normalize(dict(vector)) for label, vector in sums.items()}
+
+    @staticmethod
+    def _normalize(vector: Dict[str, float]) -> Dict[str, float]:
+        norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+        return {feature: w / norm for feature, w in vector.items()}
+
+    def _vectorize(self, features: List[str]) -> Dict[str, float]:
+        counts = Counter(f for f in features if f in self.idf)
+        return self._normalize({f: (1 + math.log(c)) * self.idf[f] for f, c in counts.items()})
+
+    def predict(self, text: str) -> Tuple[Optional[str], float]:
+        """Return (label, confidence) where confidence blends similarity and margin"""
+        vector = self._vectorize(_features(text))
+        if not vector:
+            return None, 0.0
+        scores = sorted(
+            ((sum(w * centroid.get(f, 0.0) for f, w in vector.items()), label) for label, centroid in self.centroids.items()),
+            reverse=True
         )
+        best, label = scores[0]
+        second = scores[1][0] if len(scores) > 1 else 0.0
+        if best <= 0:
+            return None, 0.0
+        margin = (best - second) / best
+        return label, min(1.0, 0.5 * margin + best)
+
+
+class IntentClassifier:
+    """Tiered mention classifier.
+
+    Precompiled rules and a local TF-IDF model settle most mentions without
+    a network call; only low-confidence cases go to the LLM. Results are
+    cached by normalized text.
+    """
+
+    def __init__(self, confidence_threshold: float = 0.7, cache_size: int = 2048):
+        self.gateway = get_llm_gateway()
+        self.confidence_threshold = confidence_threshold
+        self.cache = LRUCache(maxsize=cache_size)
+        self.stats = Counter()
+        self.model = TfidfCentroidClassifier(self._load_fixtures())
+        # The LLM tier (and langchain) is only loaded for the first low-confidence mention
+        self._chain = None
+
+    @property
+    def chain(self):
+        if self._chain is None:
+            self._chain = self._create_chain()
+        return self._chain
+
+    @staticmethod
+    def _load_fixtures() -> List[Tuple[str, str]]:
+        with open(FIXTURES_PATH, 'r') as f:
+            return [(row['text'], row['intent']) for row in json.load(f)]
+
+    def _create_chain(self):
+        from langchain.prompts import ChatPromptTemplate
+        from langchain.output_parsers import PydanticOutputParser
+
+        self.llm = self.gateway.get_llm("llama-3.2-3b-preview")
         self.parser = PydanticOutputParser(pydantic_object=IntentClassification)
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", """Classify the intent of a social media mention sent to a Gen-Z mental health bot.
+            Valid intents: {intents}.
+            Use "therapy" for anything about feelings, mental health or general chat.
+            {format_instructions}"""),
+            ("human", "{content}")
+        ]).partial(intents=', '.join(INTENTS), format_instructions=self.parser.get_format_instructions())
+        return prompt | self.llm | self.parser
+
+    def classify_fast(self, text: str) -> Optional[IntentClassification]:
+        """Rule and local-model tiers; None when neither is confident enough"""
+        normalized = normalize_text(text)
+        for intent, pattern, confidence in RULES:
+            match = pattern.search(normalized)
+            if match:
+                topic = next((value.strip() for value in match.groupdict().values() if value), None)
+                self.stats['rule'] += 1
+                return IntentClassification(intent=intent, confidence=confidence, extracted_topic=topic)
+
+        intent, confidence = self.model.predict(normalized)
+        if intent and confidence >= self.confidence_threshold:
+            self.stats['model'] += 1
+            return IntentClassification(intent=intent, confidence=confidence, extracted_topic=None)
+        return None
+
+    async def classify(self, text: str) -> IntentClassification:
+        key = normalize_text(text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.stats['cache'] += 1
+            return cached
+
+        result = self.classify_fast(text)
+        if result is None:
+            try:
+                result = await self.gateway.run(self.chain.ainvoke, {"content": text})
+                if result.intent not in INTENTS:
+                    result.intent = 'therapy'
+                self.stats['llm'] += 1
+            except Exception as e:
+                logger.error(f"Intent classification error: {e}")
+                # Not cached, so the next identical mention gets another LLM attempt
+                return IntentClassification(intent='therapy', confidence=0.0, extracted_topic=None)
+
+        self.cache.set(key, result)
+        return result
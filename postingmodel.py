@@ -2,10 +2,14 @@ import asyncio
 import logging
 from datetime import datetime, timezone
 import random
-from langchain_groq import ChatGroq
-from langchain.schema import HumanMessage, SystemMessage
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+from collections import deque
 import json
+import re
+import time
+from utils.bandit import ThompsonBandit
+from utils.llm_gateway import get_llm_gateway
+from utils.text import fit_post
 
 logger = logging.getLogger("mental_health_model")
 logging.basicConfig(level=logging.INFO)
@@ -13,7 +17,7 @@ logging.basicConfig(level=logging.INFO)
 class ContentManager:
     """Manages different types of mental health content and topics"""
     
-    def __init__(self):
+    def __init__(self, state_file: str = 'topic_bandit.json'):
         self.topics = {
             'stress_management': {
                 'subtopics': [
@@ -94,31 +98,93 @@ class ContentManager:
             }
         }
 
-        # Track topic usage to ensure variety
+        # Track topic usage for this run
         self.topic_usage = {topic: 0 for topic in self.topics.keys()}
-        
+
+        # One arm per topic/subtopic pair, learned from post engagement and persisted
+        self.bandit = ThompsonBandit(
+            (self.arm(topic, subtopic) for topic, data in self.topics.items() for subtopic in data['subtopics']),
+            state_file=state_file
+        )
+
+    @staticmethod
+    def arm(topic: str, subtopic: str) -> str:
+        return f"{topic}|{subtopic}"
+
     def get_next_topic(self) -> tuple:
-        """Get the least recently used topic and a random subtopic"""
-        # Get topic with lowest usage
-        topic = min(self.topic_usage.items(), key=lambda x: x[1])[0]
-        subtopic = random.choice(self.topics[topic]['subtopics'])
+        """Pick a topic and subtopic by Thompson sampling over past engagement"""
+        topic, subtopic = self.bandit.select().split('|', 1)
         
         # Update usage counter
         self.topic_usage[topic] += 1
         
         return topic, subtopic
 
+    def record_engagement(self, topic: str, subtopic: str, reward: float):
+        """Feed a post's engagement (scaled to 0..1) back into topic selection"""
+        self.bandit.update(self.arm(topic, subtopic), reward)
+
+    def save(self):
+        self.bandit.save()
+
+class PostBuffer:
+    """Bounded FIFO of ready-to-publish posts, persisted so it survives restarts"""
+    
+    def __init__(self, path: str = 'post_buffer.json', capacity: int = 5):
+        self.path = path
+        self.capacity = capacity
+        self.posts = deque()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                self.posts = deque(json.load(f)[:self.capacity])
+        except FileNotFoundError:
+            self.posts = deque()
+        except Exception as e:
+            logger.error(f"Error loading post buffer: {e}")
+            self.posts = deque()
+
+    def _save(self):
+        try:
+            with open(self.path, 'w') as f:
+                json.dump(list(self.posts), f)
+        except Exception as e:
+            logger.error(f"Error saving post buffer: {e}")
+
+    @property
+    def full(self) -> bool:
+        return len(self.posts) >= self.capacity
+
+    def __len__(self) -> int:
+        return len(self.posts)
+
+    def push(self, post: Dict):
+        self.posts.append(post)
+        self._save()
+
+    def requeue(self, post: Dict):
+        self.posts.appendleft(post)
+        self._save()
+
+    def pop(self) -> Optional[Dict]:
+        if not self.posts:
+            return None
+        post = self.posts.popleft()
+        self._save()
+        return post
+
 class MentalHealthPostingModel:
     def __init__(self, bot_instance):
         self.bot = bot_instance
         self.last_post_time = None
         self.content_manager = ContentManager()
+        self.post_buffer = PostBuffer(capacity=bot_instance.settings.POST_BUFFER_SIZE)
+        self._buffer_space = asyncio.Event()
         
-        # Initialize Groq LLM
-        self.llm = ChatGroq(
-            api_key=bot_instance.settings.GROQ_API_KEY,
-            model_name="mixtral-8x7b-32768"
-        )
+        # Shared Groq gateway
+        self.llm_gateway = get_llm_gateway()
         
         # Load post templates
         self.templates = {
@@ -145,13 +211,12 @@ class MentalHealthPostingModel:
             # Get next topic and subtopic
             topic, subtopic = self.content_manager.get_next_topic()
             
-            # Generate content using LLM
-            content = await self._generate_llm_content(topic, subtopic)
+            # Generate content and hashtags in one LLM call
+            content, llm_tags = await self._generate_post_parts(topic, subtopic)
             if not content:
                 return None
             
-            # Generate relevant hashtags
-            hashtags = await self._generate_hashtags(topic, subtopic)
+            hashtags = self._build_hashtags(topic, llm_tags)
             
             # Select appropriate template
             template_type = self._get_template_type(topic)
@@ -164,8 +229,7 @@ class MentalHealthPostingModel:
             )
             
             # Ensure post length
-            if len(post_text) > 280:
-                post_text = post_text[:277] + "..."
+            post_text = fit_post(post_text, self.bot.settings.POST_GRAPHEME_LIMIT)
             
             return {
                 'text': post_text,
@@ -177,8 +241,9 @@ class MentalHealthPostingModel:
             logger.error(f"Content generation error: {e}")
             return None
 
-    async def _generate_llm_content(self, topic: str, subtopic: str) -> str:
-        """Generate informative content using Groq LLM"""
+    async def _generate_post_parts(self, topic: str, subtopic: str) -> Tuple[Optional[str], List[str]]:
+        """Generate post content and hashtags with a single structured LLM call"""
+        from langchain.schema import HumanMessage, SystemMessage
         try:
             system_prompt = """You are Therapy Punch, a Gen-Z mental health advocate and expert.
             You combine professional mental health knowledge with Gen-Z slang while maintaining accuracy.
@@ -193,53 +258,48 @@ class MentalHealthPostingModel:
             4. Uses authentic Gen-Z language naturally
             5. Stays under 150 characters (to leave room for template and hashtags)
             
-            Make it engaging and memorable!"""
+            Also pick 2 trendy, relevant hashtags for this topic (without the # symbol).
+            
+            Respond with JSON only, in this exact shape:
+            {{"content": "<post text>", "hashtags": ["MentalHealthAwareness", "WellnessJourney"]}}"""
 
             messages = [
                 SystemMessage(content=system_prompt),
                 HumanMessage(content=user_prompt)
             ]
 
-            response = await self.llm.agenerate([messages])
+            response = await self.llm_gateway.agenerate([messages])
             if response and hasattr(response, 'generations') and response.generations:
-                generated_text = response.generations[0][0].text
-                return generated_text.strip()
-            return None
+                return self._parse_post_parts(response.generations[0][0].text)
+            return None, []
 
         except Exception as e:
             logger.error(f"LLM content generation error: {e}")
-            return None
+            return None, []
 
-    async def _generate_hashtags(self, topic: str, subtopic: str) -> List[str]:
-        """Generate relevant hashtags based on topic and subtopic"""
-        try:
-            # First try topic-specific hashtags from content manager
-            base_tags = ['MentalHealth', 'TherapyPunch', 'Healing']
-            topic_terms = self.content_manager.topics[topic]['key_terms']
-            topic_tags = [f"#{term.title().replace(' ', '')}" for term in topic_terms[:2]]
-            
-            # Try to get additional hashtags from LLM
-            prompt = f"""Topic: {topic} - {subtopic}
-            Generate 2 trendy, relevant hashtags for this mental health topic.
-            Return only the hashtags without # symbol, separated by spaces.
-            Example: MentalHealthAwareness WellnessJourney"""
-            
-            messages = [HumanMessage(content=prompt)]
-            response = await self.llm.agenerate([messages])
-            
-            if response and hasattr(response, 'generations') and response.generations:
-                llm_tags = response.generations[0][0].text.strip().split()
-                llm_tags = [f"#{tag}" for tag in llm_tags[:2]]
-                
-                # Combine all tags and take unique ones
-                all_tags = list(set(base_tags + topic_tags + llm_tags))
-                return all_tags[:4]
-                
-            return base_tags + topic_tags[:2]
+    @staticmethod
+    def _parse_post_parts(text: str) -> Tuple[Optional[str], List[str]]:
+        """Parse the structured response, falling back to plain text content"""
+        match = re.search(r'\{.*\}', text, re.DOTALL)
+        if match:
+            try:
+                data = json.loads(match.group(0))
+                content = str(data.get('content', '')).strip()
+                tags = [str(tag).lstrip('#').replace(' ', '') for tag in data.get('hashtags', []) if tag]
+                return content or None, tags[:2]
+            except (ValueError, AttributeError):
+                pass
+        return text.strip() or None, []
 
-        except Exception as e:
-            logger.error(f"Hashtag generation error: {e}")
-            return base_tags
+    def _build_hashtags(self, topic: str, llm_tags: List[str]) -> List[str]:
+        """Combine base, topic-specific and LLM-suggested hashtags"""
+        base_tags = ['#MentalHealth', '#TherapyPunch', '#Healing']
+        topic_terms = self.content_manager.topics[topic]['key_terms']
+        topic_tags = [f"#{term.title().replace(' ', '')}" for term in topic_terms[:2]]
+        
+        # Combine all tags and take unique ones
+        all_tags = list(dict.fromkeys(base_tags + topic_tags + [f"#{tag}" for tag in llm_tags]))
+        return all_tags[:4]
 
     def _get_template_type(self, topic: str) -> str:
         """Determine appropriate template type based on topic"""
@@ -258,15 +318,16 @@ class MentalHealthPostingModel:
             return True
         
         time_diff = (datetime.now() - self.last_post_time).total_seconds()
-        return time_diff >= 1800  # 30 minutes between posts
+        return time_diff >= self.bot.settings.POST_INTERVAL
 
     async def post_content(self) -> bool:
-        """Generate and post content"""
+        """Generate and post content; spacing between posts is the scheduler's job"""
         try:
-            if not self.can_post():
-                return False
-            
-            content = await self.generate_content()
+            # Publishing is a pop from the pre-generated buffer; generate inline only if it ran dry
+            content = self.post_buffer.pop()
+            self._buffer_space.set()
+            if not content:
+                content = await self.generate_content()
             if not content:
                 return False
             
@@ -276,6 +337,8 @@ class MentalHealthPostingModel:
                 logger.info(f"Successfully posted about {content['topic']} - {content['subtopic']}")
                 return True
             
+            # Keep the post for the next attempt
+            self.post_buffer.requeue(content)
             return False
             
         except Exception as e:
@@ -292,25 +355,59 @@ class MentalHealthPostingModel:
                 'createdAt': created_at
             }
             
-            response = self.bot.client.com.atproto.repo.create_record({
-                'repo': self.bot.settings.BLUESKY_HANDLE,
-                'collection': 'app.bsky.feed.post',
-                'record': post_record
-            })
+            uri = await self.bot.write_batcher.create('app.bsky.feed.post', post_record)
+            if uri and self.bot.engagement_store is not None:
+                self.bot.engagement_store.track(uri, content.get('topic'), content.get('subtopic'), content['text'])
             
-            return bool(response)
+            return bool(uri)
             
         except Exception as e:
             logger.error(f"Post creation error: {e}")
             return False
 
-    async def run(self):
-        """Main posting loop"""
+    async def fill_buffer(self):
+        """Background producer that keeps the post buffer topped up"""
         while True:
             try:
-                await self.post_content()
-                await asyncio.sleep(300)  # Wait 30 minutes between posts
+                if self.post_buffer.full:
+                    self._buffer_space.clear()
+                    await self._buffer_space.wait()
+                    continue
                 
+                content = await self.generate_content()
+                if content:
+                    self.post_buffer.push(content)
+                    logger.info(f"Buffered post about {content['topic']} ({len(self.post_buffer)} ready)")
+                else:
+                    await asyncio.sleep(60)
+                    
             except Exception as e:
-                logger.error(f"Run loop error: {e}")
-                await asyncio.sleep(60)  # Wait 1 minute on err
\ No newline at end of file
+                logger.error(f"Buffer producer error: {e}")
+                await asyncio.sleep(60)
+
+    def apply_engagement(self) -> int:
+        """Reward topic arms for posts whose engagement has settled"""
+        store = self.bot.engagement_store
+        if store is None:
+            return 0
+        settings = self.bot.settings
+        settled = store.settled(time.time() - settings.BANDIT_REWARD_WINDOW_HOURS * 3600)
+        for post in settled:
+            interactions = post['likes'] + post['reposts'] + post['replies'] + post['quotes']
+            self.content_manager.record_engagement(
+                post['topic'], post['subtopic'], min(1.0, interactions / settings.BANDIT_REWARD_TARGET)
+            )
+        if settled:
+            self.content_manager.save()
+            store.mark_rewarded([post['uri'] for post in settled])
+            logger.info(f"Updated topic selection from {len(settled)} settled posts")
+        return len(settled)
+
+    async def run_scheduled(self) -> Optional[float]:
+        """Scheduler job: publish one post, retrying sooner if it failed"""
+        try:
+            self.apply_engagement()
+        except Exception as e:
+            logger.error(f"Engagement feedback error: {e}")
+        success = await self.post_content()
+        return None if success else 300
@@ -1,16 +1,18 @@
 from atproto import Client
 import os
 from dotenv import load_dotenv
+from utils.session import SessionManager
 
 load_dotenv()
 
 def test_connection():
     client = Client()
     try:
-        client.login(
+        SessionManager(
+            client,
             os.getenv('BLUESKY_HANDLE'),
             os.getenv('BLUESKY_PASSWORD')
-        )
+        ).login()
         print("Successfully connected to Bluesky!")
         
         # Test post
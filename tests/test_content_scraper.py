@@ -0,0 +1,46 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from content_scraper import ContentScraper
+from utils.news_store import NewsStore
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'sample_feed.xml')
+
+
+def test_scrape_fixture_feed(tmp_path):
+    store = NewsStore(str(tmp_path / 'news.db'), legacy_file=None)
+    scraper = ContentScraper(
+        feeds={'Sample': FIXTURE},
+        state_file=str(tmp_path / 'feed_state.json'),
+        store=store
+    )
+
+    async def scrape_twice():
+        try:
+            return await scraper.scrape_content(), await scraper.scrape_content()
+        finally:
+            await scraper.close()
+
+    first, second = asyncio.run(scrape_twice())
+
+    assert [item['url'] for item in first] == [
+        'https://example.com/posts/model-benchmarks',
+        'https://example.com/posts/sleep-and-focus',
+    ]
+    benchmarks = first[0]
+    assert benchmarks['title'] == 'New model & benchmark results'
+    assert benchmarks['content'].startswith('Researchers published benchmark results')
+    assert benchmarks['source'] == 'Sample'
+    assert benchmarks['timestamp'] == '2024-02-05T10:30:00'
+    assert benchmarks['score'] == len(benchmarks['content'])
+
+    # The unchanged file is skipped on the next scrape
+    assert second == []
+    assert scraper.stats['not_modified'] == 1
+
+    assert len(store) == 2
+    assert store.last_scrape_date is not None
+    store.close()
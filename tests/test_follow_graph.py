@@ -0,0 +1,60 @@
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.follow_graph import FollowGraphSync
+
+
+class FakeGraph:
+    def __init__(self, followers, follows, profiles):
+        self.followers = followers
+        self.follows = follows
+        self.profiles = profiles
+
+    async def get_followers(self, params):
+        return SimpleNamespace(followers=[SimpleNamespace(did=did) for did in self.followers], cursor=None)
+
+    async def get_follows(self, params):
+        return SimpleNamespace(follows=[SimpleNamespace(did=did) for did in self.follows], cursor=None)
+
+    async def get_profiles(self, params):
+        return SimpleNamespace(profiles=[
+            SimpleNamespace(did=did, viewer=SimpleNamespace(following=self.profiles[did]))
+            for did in params['actors'] if did in self.profiles
+        ])
+
+
+def make_graph(tmp_path, fake, **kwargs):
+    api = SimpleNamespace(app=SimpleNamespace(bsky=SimpleNamespace(graph=fake, actor=fake)))
+    return FollowGraphSync(api, 'bot.test', snapshot_file=str(tmp_path / 'graph.json'), **kwargs)
+
+
+def test_verify_skips_outside_follows_and_deleted_accounts(tmp_path):
+    fake = FakeGraph(
+        followers=['did:new', 'did:elsewhere', 'did:gone'],
+        follows=[],
+        profiles={'did:new': None, 'did:elsewhere': 'at://did:bot/app.bsky.graph.follow/1'}
+    )
+    graph = make_graph(tmp_path, fake)
+    pending = asyncio.run(graph.sync())
+    assert asyncio.run(graph.verify(sorted(pending))) == ['did:new']
+    assert 'did:elsewhere' in graph.following
+    assert graph.pending == {'did:new'}
+
+
+def test_rejected_follows_stop_after_max_rejections(tmp_path):
+    fake = FakeGraph(followers=['did:blocked'], follows=[], profiles={'did:blocked': None})
+    graph = make_graph(tmp_path, fake, max_rejections=2)
+    asyncio.run(graph.sync())
+    graph.mark_rejected('did:blocked')
+    assert graph.pending == {'did:blocked'}
+    graph.mark_rejected('did:blocked')
+    assert graph.pending == set()
+    graph.save()
+
+    # Survives a restart and a full resync
+    reloaded = make_graph(tmp_path, fake, max_rejections=2, full_resync_every=1)
+    assert asyncio.run(reloaded.sync()) == []
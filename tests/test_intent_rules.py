@@ -0,0 +1,57 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nlp.intent_classifier import RULES
+from utils.text import normalize_text
+
+
+def rule_intent(text):
+    """First matching rule, as IntentClassifier.classify_fast checks them"""
+    normalized = normalize_text(text)
+    return next((intent for intent, pattern, _ in RULES if pattern.search(normalized)), None)
+
+
+DISTRESS = [
+    "i want to die",
+    "i wanna die",
+    "i wanna kill myself",
+    "thinking about ending it all",
+    "i just want to end it all",
+    "i'm going to end my life",
+    "sometimes i think about how to unalive myself",
+    "i don't want to live anymore",
+    "i feel like a joke",
+    "i can't do this anymore",
+]
+
+TRIGGERS = [
+    "lol make me laugh",
+    "tell me a joke",
+    "make a thread about it",
+    "break it down step by step",
+    "fact check this",
+    "is this true?",
+]
+
+
+@pytest.mark.parametrize('trigger', TRIGGERS)
+@pytest.mark.parametrize('distress', DISTRESS)
+def test_distress_wins_over_other_triggers(distress, trigger):
+    assert rule_intent(f"{distress} {trigger}") == 'therapy'
+    assert rule_intent(f"{trigger}, {distress}") == 'therapy'
+
+
+@pytest.mark.parametrize('text, intent', [
+    ("tell me a joke about cats", 'meme'),
+    ("make a thread about sleep hygiene", 'thread'),
+    ("is this true? @someone said coffee cures anxiety", 'therapy'),
+    ("fact check this claim about vaccines", 'fact_check'),
+    ("this movie is killing me lol", None),
+    ("the ending of that show was wild", None),
+])
+def test_rules_without_distress(text, intent):
+    assert rule_intent(text) == intent
@@ -0,0 +1,121 @@
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.notification_poller import NotificationPoller
+
+
+def note(uri, second):
+    return SimpleNamespace(uri=uri, indexed_at=f"2026-01-01T00:00:{second:02d}Z", reason='mention')
+
+
+class FakeNotifications:
+    """listNotifications over a newest-first list, with optional failing pages"""
+
+    def __init__(self, items, page_size=2):
+        self.items = items
+        self.page_size = page_size
+        self.fail_pages = set()
+        self.seen = []
+
+    async def list_notifications(self, params):
+        start = int(params.get('cursor') or 0)
+        if start // self.page_size in self.fail_pages:
+            raise ConnectionError('page failed')
+        end = start + self.page_size
+        return SimpleNamespace(
+            notifications=self.items[start:end],
+            cursor=str(end) if end < len(self.items) else None
+        )
+
+    async def update_seen(self, params):
+        self.seen.append(params['seenAt'])
+
+
+EPOCH = '2026-01-01T00:00:00Z'
+
+
+def make_poller(tmp_path, items, **kwargs):
+    feed = FakeNotifications(items)
+    api = SimpleNamespace(app=SimpleNamespace(bsky=SimpleNamespace(notification=feed)))
+    poller = NotificationPoller(api, state_file=str(tmp_path / 'state.json'), page_size=feed.page_size, **kwargs)
+    if poller.seen_at is None:
+        # Without a watermark only the first page is read
+        poller.seen_at = EPOCH
+    return poller, feed
+
+
+def uris(items):
+    return [item.uri for item in items]
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_watermark_stops_at_unfinished_and_keeps_ties(tmp_path):
+    poller, feed = make_poller(tmp_path, [note('d', 3), note('c', 2), note('b', 2), note('a', 1)])
+    assert uris(run(poller.poll())) == ['a', 'b', 'c', 'd']
+
+    poller.complete('a')
+    poller.complete('b')
+    poller.complete('d')
+    run(poller.mark_seen())
+    # c shares b's timestamp and is still queued
+    assert poller.seen_at == '2026-01-01T00:00:02Z'
+    assert poller.seen_uris == ['b']
+    assert run(poller.poll()) == []
+
+    poller.complete('c')
+    run(poller.mark_seen())
+    assert poller.seen_at == '2026-01-01T00:00:03Z'
+    assert feed.seen == ['2026-01-01T00:00:02Z', '2026-01-01T00:00:03Z']
+
+    restarted, _ = make_poller(tmp_path, feed.items)
+    assert run(restarted.poll()) == []
+
+
+def test_failed_page_claims_nothing(tmp_path):
+    poller, feed = make_poller(tmp_path, [note('d', 4), note('c', 3), note('b', 2), note('a', 1)])
+    feed.fail_pages = {1}
+    with pytest.raises(ConnectionError):
+        run(poller.poll())
+    assert poller.window == {}
+
+    feed.fail_pages = set()
+    assert uris(run(poller.poll())) == ['a', 'b', 'c', 'd']
+
+
+def test_failures_are_repolled_until_max_attempts(tmp_path):
+    poller, _ = make_poller(tmp_path, [note('b', 2), note('a', 1)], max_attempts=2)
+    run(poller.poll())
+    poller.complete('b')
+    poller.complete('a', success=False)
+    run(poller.mark_seen())
+    assert poller.seen_at == EPOCH
+
+    assert uris(run(poller.poll())) == ['a']
+    poller.complete('a', success=False)
+    run(poller.mark_seen())
+    # Given up on: the watermark moves past it
+    assert poller.seen_at == '2026-01-01T00:00:02Z'
+    assert run(poller.poll()) == []
+
+
+def test_released_items_come_back_without_spending_an_attempt(tmp_path):
+    poller, _ = make_poller(tmp_path, [note('b', 2), note('a', 1)], max_attempts=1)
+    run(poller.poll())
+    poller.release('a')
+    poller.release('b')
+    assert uris(run(poller.poll())) == ['a', 'b']
+    assert poller.window['a'][2] == 0
+
+    # Releasing a finished item does not reopen it
+    poller.complete('a')
+    poller.release('a')
+    assert uris(run(poller.poll())) == []
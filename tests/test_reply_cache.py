@@ -0,0 +1,34 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.reply_cache import ReplyCache
+
+
+@pytest.mark.parametrize('reply', ["my family is great", "friendship matters", "forgiving yourself is hard"])
+def test_vary_reply_leaves_words_containing_slang_alone(reply):
+    for _ in range(20):
+        assert ReplyCache.vary_reply(reply).endswith(reply)
+
+
+def test_vary_reply_swaps_whole_phrases_and_keeps_case():
+    varied = {ReplyCache.vary_reply("Bestie, it's giving main character") for _ in range(50)}
+    assert varied <= {
+        "Fam, it's giving main character",
+        "Friend, it's giving main character",
+        "Bestie, giving main character",
+    }
+    assert {ReplyCache.vary_reply("NO CAP") for _ in range(20)} <= {"FOR REAL THO", "HONESTLY"}
+
+
+def test_replies_are_only_cached_under_a_parent():
+    cache = ReplyCache(vary=False)
+    cache.set(None, "i feel sad", "top-level reply")
+    assert cache.get(None, "i feel sad") is None
+
+    cache.set("at://did:plc:a/app.bsky.feed.post/1", "@bot is this TRUE??", "reply")
+    assert cache.get("at://did:plc:a/app.bsky.feed.post/1", "is this true") == "reply"
+    assert cache.get("at://did:plc:a/app.bsky.feed.post/2", "is this true") is None
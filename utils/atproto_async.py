@@ -0,0 +1,56 @@
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+logger = logging.getLogger("atproto_async")
+
+
+class _AsyncNamespace:
+    """Proxy over an atproto namespace whose method calls return awaitables"""
+
+    def __init__(self, transport: "AsyncATProtoClient", target: Any):
+        self._transport = transport
+        self._target = target
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._target, name)
+        if callable(attr):
+            return functools.partial(self._transport.call, attr)
+        return _AsyncNamespace(self._transport, attr)
+
+
+class AsyncATProtoClient:
+    """Runs the synchronous atproto Client on a bounded thread pool.
+
+    Namespace calls mirror the sync client, e.g.
+    ``await api.app.bsky.feed.get_post_thread({'uri': uri})``, so slow
+    network calls no longer block the event loop.
+    """
+
+    def __init__(self, client, max_workers: int = 8, rate_limiter=None):
+        self.client = client
+        self.rate_limiter = rate_limiter
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="atproto")
+
+    async def call(self, func: Callable, *args, **kwargs):
+        """Run a blocking client call in the executor, within the shared rate budget"""
+        loop = asyncio.get_running_loop()
+
+        def run():
+            return loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+        if self.rate_limiter is None:
+            return await run()
+        name = getattr(func, '__name__', '')
+        cost = 1
+        if name == 'apply_writes' and args and isinstance(args[0], dict):
+            cost = max(1, len(args[0].get('writes', [])))
+        return await self.rate_limiter.call(self.rate_limiter.classify(name), run, cost=cost)
+
+    def __getattr__(self, name: str):
+        return _AsyncNamespace(self, getattr(self.client, name))
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,98 @@
+import heapq
+import itertools
+import json
+import logging
+import random
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger("bandit")
+
+
+class ThompsonBandit:
+    """Beta-Bernoulli Thompson sampling with heap-based selection.
+
+    Every arm keeps one posterior draw in a max-heap. ``select`` pops the
+    best draw and redraws that arm plus ``refresh`` random others (so an
+    arm that drew low is not frozen out), and ``update`` redraws only the
+    arm it changed, so both are O(log n) instead of resampling every arm
+    per pick. Rewards are fractional in [0, 1].
+    Posteriors are persisted to ``state_file`` as JSON.
+    """
+
+    def __init__(self, arms: Iterable[str], state_file: Optional[str] = None,
+                 prior: Tuple[float, float] = (1.0, 1.0), rng: Optional[random.Random] = None, refresh: int = 2):
+        self.state_file = state_file
+        self.refresh = refresh
+        self.prior = prior
+        self.rng = rng or random.Random()
+        self.arms: Dict[str, List[float]] = {arm: list(prior) for arm in arms}
+        self._load()
+        self._names = list(self.arms)
+        self._versions = {arm: 0 for arm in self.arms}
+        self._counter = itertools.count()
+        self._heap: List[Tuple[float, int, int, str]] = []
+        for arm in self.arms:
+            self._push(arm)
+
+    def _load(self):
+        if not self.state_file:
+            return
+        try:
+            with open(self.state_file, 'r') as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.error(f"Error loading bandit state: {e}")
+            return
+        # Arms that no longer exist are dropped; new arms keep the prior
+        for arm, params in saved.items():
+            if arm in self.arms:
+                self.arms[arm] = [float(params[0]), float(params[1])]
+
+    def save(self):
+        if not self.state_file:
+            return
+        try:
+            with open(self.state_file, 'w') as f:
+                json.dump(self.arms, f)
+        except Exception as e:
+            logger.error(f"Error saving bandit state: {e}")
+
+    def _push(self, arm: str):
+        alpha, beta = self.arms[arm]
+        self._versions[arm] += 1
+        heapq.heappush(self._heap, (-self.rng.betavariate(alpha, beta), next(self._counter), self._versions[arm], arm))
+        if len(self._heap) > 4 * len(self.arms):
+            # Drop superseded draws
+            self._heap = [entry for entry in self._heap if entry[2] == self._versions[entry[3]]]
+            heapq.heapify(self._heap)
+
+    def select(self) -> str:
+        while True:
+            _, _, version, arm = heapq.heappop(self._heap)
+            if version == self._versions[arm]:
+                self._push(arm)
+                for _ in range(self.refresh):
+                    self._push(self.rng.choice(self._names))
+                return arm
+
+    def update(self, arm: str, reward: float):
+        if arm not in self.arms:
+            return
+        reward = min(1.0, max(0.0, reward))
+        self.arms[arm][0] += reward
+        self.arms[arm][1] += 1.0 - reward
+        self._push(arm)
+
+    def mean(self, arm: str) -> float:
+        alpha, beta = self.arms[arm]
+        return alpha / (alpha + beta)
+
+    def ranking(self) -> List[Tuple[str, float, float]]:
+        """(arm, posterior mean, pseudo-observations) best first"""
+        return sorted(
+            ((arm, self.mean(arm), sum(params) - sum(self.prior)) for arm, params in self.arms.items()),
+            key=lambda row: row[1],
+            reverse=True
+        )
@@ -0,0 +1,159 @@
+import json
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+logger = logging.getLogger("cache")
+
+_MISSING = object()
+
+
+class LRUCache:
+    """In-memory LRU cache with an optional per-entry TTL"""
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING or (self.ttl is not None and time.monotonic() - entry[1] > self.ttl):
+            if entry is not _MISSING:
+                del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, key: Hashable, value: Any):
+        self._data[key] = (value, time.monotonic())
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.pop(key, _MISSING)
+        return default if entry is _MISSING else entry[0]
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self):
+        self._data.clear()
+
+
+class DiskCache:
+    """SQLite key/value tier for JSON-serialisable values.
+
+    Bounded like the memory tier: entries older than ``ttl`` are dropped,
+    and writes evict the least recently used rows beyond ``maxsize``.
+    """
+
+    def __init__(self, path: str, table: str = 'cache', ttl: Optional[float] = None, maxsize: Optional[int] = None):
+        self.table = table
+        self.ttl = ttl
+        self.maxsize = maxsize
+        # Opened off the event loop during startup and used from the loop afterwards
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        columns = {row[1] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+        if 'last_used' not in columns:
+            # Caches written before eviction; rows start at their creation time
+            self.conn.execute(f"ALTER TABLE {table} ADD COLUMN last_used REAL NOT NULL DEFAULT 0")
+            self.conn.execute(f"UPDATE {table} SET last_used = created_at")
+        self.conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_last_used ON {table}(last_used)")
+        self.conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_created_at ON {table}(created_at)")
+        self.conn.commit()
+        self.trim()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            row = self.conn.execute(f"SELECT value, created_at FROM {self.table} WHERE key = ?", (key,)).fetchone()
+        except Exception as e:
+            logger.error(f"Disk cache read error: {e}")
+            return default
+        if not row or (self.ttl is not None and time.time() - row[1] > self.ttl):
+            return default
+        try:
+            value = json.loads(row[0])
+        except ValueError:
+            return default
+        try:
+            with self.conn:
+                self.conn.execute(f"UPDATE {self.table} SET last_used = ? WHERE key = ?", (time.time(), key))
+        except Exception as e:
+            logger.error(f"Disk cache write error: {e}")
+        return value
+
+    def set(self, key: str, value: Any):
+        now = time.time()
+        try:
+            with self.conn:
+                self.conn.execute(
+                    f"INSERT OR REPLACE INTO {self.table} (key, value, created_at, last_used) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value), now, now)
+                )
+        except Exception as e:
+            logger.error(f"Disk cache write error: {e}")
+            return
+        self.trim()
+
+    def trim(self) -> int:
+        """Drop expired rows, then least recently used rows beyond ``maxsize``"""
+        removed = 0
+        try:
+            with self.conn:
+                if self.ttl is not None:
+                    removed += self.conn.execute(
+                        f"DELETE FROM {self.table} WHERE created_at < ?", (time.time() - self.ttl,)
+                    ).rowcount
+                if self.maxsize is not None:
+                    excess = len(self) - self.maxsize
+                    if excess > 0:
+                        removed += self.conn.execute(f"""
+                            DELETE FROM {self.table} WHERE key IN (
+                                SELECT key FROM {self.table} ORDER BY last_used LIMIT ?
+                            )
+                        """, (excess,)).rowcount
+        except Exception as e:
+            logger.error(f"Disk cache trim error: {e}")
+        return removed
+
+    def __len__(self) -> int:
+        return self.conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+
+class TieredCache:
+    """LRU memory tier in front of an optional DiskCache"""
+
+    def __init__(self, memory: LRUCache, disk: Optional[DiskCache] = None):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self.memory.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if self.disk is not None:
+            value = self.disk.get(key, _MISSING)
+            if value is not _MISSING:
+                self.memory.set(key, value)
+                return value
+        return default
+
+    def set(self, key: str, value: Any):
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
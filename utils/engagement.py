@@ -0,0 +1,249 @@
+import logging
+import sqlite3
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("engagement")
+
+METRICS = ('likes', 'reposts', 'replies', 'quotes')
+# app.bsky.feed.getPosts accepts at most this many URIs per request
+GET_POSTS_LIMIT = 25
+
+
+class EngagementStore:
+    """SQLite time series of engagement counts for the bot's own posts.
+
+    Each refresh appends a raw sample; samples older than
+    ``raw_retention_days`` are rolled up into one row per post per day
+    (counts are cumulative, so the day's maximum is kept). ``tracked_posts``
+    holds the latest counts and the next poll time, indexed so picking the
+    posts due for a refresh is an index range scan.
+    """
+
+    def __init__(self, path: str = 'engagement.db', raw_retention_days: float = 2):
+        self.raw_retention = raw_retention_days * 86400
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS tracked_posts (
+                uri TEXT PRIMARY KEY,
+                topic TEXT,
+                subtopic TEXT,
+                text TEXT,
+                created_at REAL NOT NULL,
+                next_poll REAL,
+                polls INTEGER NOT NULL DEFAULT 0,
+                likes INTEGER NOT NULL DEFAULT 0,
+                reposts INTEGER NOT NULL DEFAULT 0,
+                replies INTEGER NOT NULL DEFAULT 0,
+                quotes INTEGER NOT NULL DEFAULT 0,
+                engagement_rate REAL NOT NULL DEFAULT 0,
+                rewarded INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS idx_tracked_next_poll ON tracked_posts(next_poll) WHERE next_poll IS NOT NULL;
+            CREATE INDEX IF NOT EXISTS idx_tracked_topic ON tracked_posts(topic, subtopic);
+            CREATE TABLE IF NOT EXISTS engagement_samples (
+                uri TEXT NOT NULL,
+                ts INTEGER NOT NULL,
+                likes INTEGER NOT NULL,
+                reposts INTEGER NOT NULL,
+                replies INTEGER NOT NULL,
+                quotes INTEGER NOT NULL,
+                PRIMARY KEY (uri, ts)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_samples_ts ON engagement_samples(ts);
+            CREATE TABLE IF NOT EXISTS engagement_daily (
+                uri TEXT NOT NULL,
+                day INTEGER NOT NULL,
+                likes INTEGER NOT NULL,
+                reposts INTEGER NOT NULL,
+                replies INTEGER NOT NULL,
+                quotes INTEGER NOT NULL,
+                PRIMARY KEY (uri, day)
+            ) WITHOUT ROWID;
+        """)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(tracked_posts)")}
+        if 'rewarded' not in columns:
+            self.conn.execute("ALTER TABLE tracked_posts ADD COLUMN rewarded INTEGER NOT NULL DEFAULT 0")
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tracked_unrewarded ON tracked_posts(created_at) WHERE rewarded = 0"
+        )
+        self.conn.commit()
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM tracked_posts").fetchone()[0]
+
+    def track(self, uri: str, topic: Optional[str] = None, subtopic: Optional[str] = None,
+              text: Optional[str] = None, first_poll_in: float = 300):
+        now = time.time()
+        with self.conn:
+            self.conn.execute("""
+                INSERT OR IGNORE INTO tracked_posts (uri, topic, subtopic, text, created_at, next_poll)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (uri, topic, subtopic, text, now, now + first_poll_in))
+
+    def due(self, now: Optional[float] = None, limit: int = 100) -> List[str]:
+        rows = self.conn.execute(
+            "SELECT uri FROM tracked_posts WHERE next_poll IS NOT NULL AND next_poll <= ? ORDER BY next_poll LIMIT ?",
+            (now or time.time(), limit)
+        )
+        return [row['uri'] for row in rows]
+
+    def next_due(self) -> Optional[float]:
+        row = self.conn.execute("SELECT MIN(next_poll) FROM tracked_posts WHERE next_poll IS NOT NULL").fetchone()
+        return row[0]
+
+    def get(self, uri: str) -> Optional[Dict]:
+        row = self.conn.execute("SELECT * FROM tracked_posts WHERE uri = ?", (uri,)).fetchone()
+        return dict(row) if row else None
+
+    def record(self, uri: str, counts: Dict[str, int], next_poll: Optional[float], now: Optional[float] = None):
+        """Store a sample and the post's latest counts; ``next_poll=None`` stops polling it"""
+        now = now or time.time()
+        values = tuple(int(counts.get(metric, 0)) for metric in METRICS)
+        with self.conn:
+            row = self.conn.execute("SELECT created_at FROM tracked_posts WHERE uri = ?", (uri,)).fetchone()
+            if row is None:
+                return
+            hours = max((now - row['created_at']) / 3600, 1.0)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO engagement_samples (uri, ts, likes, reposts, replies, quotes) VALUES (?, ?, ?, ?, ?, ?)",
+                (uri, int(now)) + values
+            )
+            self.conn.execute("""
+                UPDATE tracked_posts SET likes = ?, reposts = ?, replies = ?, quotes = ?,
+                    engagement_rate = ?, next_poll = ?, polls = polls + 1
+                WHERE uri = ?
+            """, values + (sum(values) / hours, next_poll, uri))
+
+    def retire(self, uri: str):
+        """Stop polling a post (too old, or deleted)"""
+        with self.conn:
+            self.conn.execute("UPDATE tracked_posts SET next_poll = NULL WHERE uri = ?", (uri,))
+
+    def rollup(self, now: Optional[float] = None) -> int:
+        """Fold raw samples past the retention window into daily rows"""
+        cutoff = int((now or time.time()) - self.raw_retention)
+        with self.conn:
+            self.conn.execute("""
+                INSERT INTO engagement_daily (uri, day, likes, reposts, replies, quotes)
+                SELECT uri, ts / 86400, MAX(likes), MAX(reposts), MAX(replies), MAX(quotes)
+                FROM engagement_samples WHERE ts < ? GROUP BY uri, ts / 86400
+                ON CONFLICT(uri, day) DO UPDATE SET
+                    likes = MAX(likes, excluded.likes),
+                    reposts = MAX(reposts, excluded.reposts),
+                    replies = MAX(replies, excluded.replies),
+                    quotes = MAX(quotes, excluded.quotes)
+            """, (cutoff,))
+            cursor = self.conn.execute("DELETE FROM engagement_samples WHERE ts < ?", (cutoff,))
+        return cursor.rowcount
+
+    def series(self, uri: str) -> List[Dict]:
+        """Daily rollups followed by raw samples, oldest first"""
+        daily = self.conn.execute(
+            "SELECT day * 86400 AS ts, likes, reposts, replies, quotes FROM engagement_daily WHERE uri = ? ORDER BY day",
+            (uri,)
+        ).fetchall()
+        raw = self.conn.execute(
+            "SELECT ts, likes, reposts, replies, quotes FROM engagement_samples WHERE uri = ? ORDER BY ts", (uri,)
+        ).fetchall()
+        return [dict(row) for row in daily + raw]
+
+    def by_topic(self) -> List[Dict]:
+        """Post count and mean engagement per topic and subtopic"""
+        rows = self.conn.execute("""
+            SELECT topic, subtopic, COUNT(*) AS posts, AVG(engagement_rate) AS engagement_rate,
+                AVG(likes + reposts + replies + quotes) AS interactions
+            FROM tracked_posts WHERE topic IS NOT NULL AND polls > 0
+            GROUP BY topic, subtopic
+        """)
+        return [dict(row) for row in rows]
+
+    def settled(self, created_before: float, limit: int = 100) -> List[Dict]:
+        """Polled posts created before ``created_before`` whose engagement has not been consumed yet"""
+        rows = self.conn.execute("""
+            SELECT * FROM tracked_posts
+            WHERE rewarded = 0 AND created_at < ? AND polls > 0 AND topic IS NOT NULL
+            ORDER BY created_at LIMIT ?
+        """, (created_before, limit))
+        return [dict(row) for row in rows]
+
+    def mark_rewarded(self, uris: List[str]):
+        with self.conn:
+            self.conn.executemany("UPDATE tracked_posts SET rewarded = 1 WHERE uri = ?", ((uri,) for uri in uris))
+
+    def close(self):
+        self.conn.close()
+
+
+class EngagementCollector:
+    """Refreshes engagement for the bot's recent posts in batched getPosts calls.
+
+    Posts are polled on a decaying schedule: the gap between refreshes is a
+    fraction of the post's age (clamped to ``min_interval``..``max_interval``),
+    halved again while a post is still gaining interactions. Posts older
+    than ``max_age_days`` are retired, so a cycle costs a handful of
+    requests however many posts the bot has made.
+    """
+
+    def __init__(self, api, store: EngagementStore, min_interval: float = 300, max_interval: float = 21600,
+                 max_age_days: float = 7, age_fraction: float = 0.25, max_batches: int = 4):
+        self.api = api
+        self.store = store
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_age = max_age_days * 86400
+        self.age_fraction = age_fraction
+        self.max_batches = max_batches
+        self.requests = 0
+
+    def poll_interval(self, age: float, gained: int) -> float:
+        interval = age * self.age_fraction
+        if gained > 0:
+            interval /= 2
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    @staticmethod
+    def _counts(post) -> Dict[str, int]:
+        return {
+            'likes': getattr(post, 'like_count', 0) or 0,
+            'reposts': getattr(post, 'repost_count', 0) or 0,
+            'replies': getattr(post, 'reply_count', 0) or 0,
+            'quotes': getattr(post, 'quote_count', 0) or 0,
+        }
+
+    async def collect(self) -> Optional[float]:
+        """Scheduler job: refresh due posts and return the delay until the next one is due"""
+        now = time.time()
+        due = self.store.due(now, limit=GET_POSTS_LIMIT * self.max_batches)
+        for i in range(0, len(due), GET_POSTS_LIMIT):
+            batch = due[i:i + GET_POSTS_LIMIT]
+            try:
+                response = await self.api.app.bsky.feed.get_posts({'uris': batch})
+                self.requests += 1
+            except Exception as e:
+                logger.error(f"Engagement fetch error: {e}")
+                break
+            posts = {post.uri: post for post in response.posts}
+            for uri in batch:
+                post = posts.get(uri)
+                tracked = self.store.get(uri)
+                if post is None or tracked is None:
+                    self.store.retire(uri)
+                    continue
+                counts = self._counts(post)
+                age = now - tracked['created_at']
+                gained = sum(counts.values()) - sum(tracked[metric] for metric in counts)
+                next_poll = now + self.poll_interval(age, gained) if age < self.max_age else None
+                self.store.record(uri, counts, next_poll, now)
+
+        if due:
+            logger.info(f"Refreshed engagement for {len(due)} posts")
+        self.store.rollup(now)
+
+        next_due = self.store.next_due()
+        if next_due is None:
+            return None
+        return max(self.min_interval, next_due - time.time())
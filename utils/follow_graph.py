@@ -0,0 +1,154 @@
+import json
+import logging
+from typing import Dict, List, Optional, Set
+
+logger = logging.getLogger("follow_graph")
+
+# app.bsky.actor.getProfiles accepts at most this many actors per request
+GET_PROFILES_LIMIT = 25
+
+
+class FollowGraphSync:
+    """Incremental follow-back reconciliation backed by a persisted DID snapshot.
+
+    The first run (and every ``full_resync_every`` cycles) pages through all
+    followers and follows. In between, getFollowers is paged newest-first
+    only until it reaches followers already in the snapshot, so a cycle
+    costs about one request regardless of follower count. Unfollows are
+    picked up on the next full resync.
+
+    Before following back, ``verify`` checks the pending DIDs' profiles, so
+    accounts followed outside the bot are not followed twice and deleted
+    accounts are dropped. A follow the server rejects is retried at most
+    ``max_rejections`` times.
+    """
+
+    def __init__(self, api, actor: str, snapshot_file: str = 'follow_graph.json',
+                 page_size: int = 100, full_resync_every: int = 288, max_rejections: int = 3):
+        self.api = api
+        self.actor = actor
+        self.snapshot_file = snapshot_file
+        self.page_size = page_size
+        self.full_resync_every = full_resync_every
+        self.max_rejections = max_rejections
+        self.followers: Set[str] = set()
+        self.following: Set[str] = set()
+        self.pending: Set[str] = set()
+        # DID -> number of follow-backs the server rejected
+        self.rejected: Dict[str, int] = {}
+        self._dirty = False
+        self._has_snapshot = self._load()
+        # A loaded snapshot is trusted until the next scheduled full resync
+        self._cycles = 1 if self._has_snapshot else 0
+
+    def _load(self) -> bool:
+        try:
+            with open(self.snapshot_file, 'r') as f:
+                snapshot = json.load(f)
+            self.followers = set(snapshot.get('followers', []))
+            self.following = set(snapshot.get('following', []))
+            self.rejected = snapshot.get('rejected', {})
+            self.pending = self._awaiting(self.followers)
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.error(f"Error loading follow graph snapshot: {e}")
+            return False
+
+    def save(self):
+        if not self._dirty:
+            return
+        try:
+            with open(self.snapshot_file, 'w') as f:
+                json.dump({
+                    'followers': sorted(self.followers),
+                    'following': sorted(self.following),
+                    'rejected': self.rejected
+                }, f)
+            self._dirty = False
+        except Exception as e:
+            logger.error(f"Error saving follow graph snapshot: {e}")
+
+    def _awaiting(self, dids) -> Set[str]:
+        """DIDs still to follow back: not followed and not given up on"""
+        return {
+            did for did in dids
+            if did not in self.following and self.rejected.get(did, 0) < self.max_rejections
+        }
+
+    async def _page(self, method, key: str, known: Optional[Set[str]] = None) -> List[str]:
+        """Collect DIDs across pages, stopping early at the first known DID"""
+        dids = []
+        cursor = None
+        while True:
+            params = {'actor': self.actor, 'limit': self.page_size}
+            if cursor:
+                params['cursor'] = cursor
+            response = await method(params)
+            page = [profile.did for profile in getattr(response, key) or []]
+            if known is not None:
+                fresh = [did for did in page if did not in known]
+                dids.extend(fresh)
+                if len(fresh) < len(page):
+                    break
+            else:
+                dids.extend(page)
+            cursor = getattr(response, 'cursor', None)
+            if not cursor or not page:
+                break
+        return dids
+
+    async def sync(self) -> List[str]:
+        """Refresh the graph and return follower DIDs still awaiting a follow-back"""
+        graph = self.api.app.bsky.graph
+        if not self._has_snapshot or (self.full_resync_every and self._cycles % self.full_resync_every == 0):
+            self.followers = set(await self._page(graph.get_followers, 'followers'))
+            self.following = set(await self._page(graph.get_follows, 'follows'))
+            # Forget rejections for accounts that stopped following
+            self.rejected = {did: count for did, count in self.rejected.items() if did in self.followers}
+            self.pending = self._awaiting(self.followers)
+            self._has_snapshot = True
+            self._dirty = True
+            logger.info(f"Full follow graph sync: {len(self.followers)} followers, {len(self.following)} follows")
+        else:
+            new_followers = await self._page(graph.get_followers, 'followers', known=self.followers)
+            if new_followers:
+                self.followers.update(new_followers)
+                self.pending.update(self._awaiting(new_followers))
+                self._dirty = True
+        self._cycles += 1
+        self.save()
+        return list(self.pending)
+
+    async def verify(self, dids: List[str]) -> List[str]:
+        """Drop DIDs already followed (e.g. from another client) or whose account is gone"""
+        remaining = []
+        for i in range(0, len(dids), GET_PROFILES_LIMIT):
+            batch = dids[i:i + GET_PROFILES_LIMIT]
+            response = await self.api.app.bsky.actor.get_profiles({'actors': batch})
+            profiles = {profile.did: profile for profile in response.profiles or []}
+            for did in batch:
+                profile = profiles.get(did)
+                if profile is None:
+                    # Deleted, deactivated or taken down
+                    self.pending.discard(did)
+                elif getattr(getattr(profile, 'viewer', None), 'following', None):
+                    self.mark_followed(did)
+                else:
+                    remaining.append(did)
+        return remaining
+
+    def mark_followed(self, did: str):
+        self.following.add(did)
+        self.pending.discard(did)
+        self.rejected.pop(did, None)
+        self._dirty = True
+
+    def mark_rejected(self, did: str):
+        """Count a follow the server refused; stop retrying after ``max_rejections``"""
+        self.rejected[did] = self.rejected.get(did, 0) + 1
+        if self.rejected[did] >= self.max_rejections:
+            self.pending.discard(did)
+            logger.warning(f"Giving up following back {did} after {self.rejected[did]} rejections")
+        self._dirty = True
@@ -0,0 +1,181 @@
+import asyncio
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+from utils.rate_limiter import RateLimiter, get_rate_limiter
+from utils.text import fit_post, grapheme_len
+
+if TYPE_CHECKING:
+    from langchain_groq import ChatGroq
+
+logger = logging.getLogger("llm_gateway")
+
+DEFAULT_MODEL = "mixtral-8x7b-32768"
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, asyncio.TimeoutError):
+        return True
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+    # No status means a connection-level failure
+    return status is None or status == 429 or status >= 500
+
+
+class LLMGateway:
+    """Single entry point for every Groq call in the process.
+
+    Owns one pooled ChatGroq client per model and wraps each call with a
+    global concurrency semaphore, the shared ``llm`` rate budget, a per-call
+    timeout, jittered exponential retries and request accounting.
+    """
+
+    def __init__(self, api_key: str, rate_limiter: Optional[RateLimiter] = None, max_concurrency: int = 4,
+                 timeout: float = 30, max_retries: int = 3, default_model: str = DEFAULT_MODEL):
+        self.api_key = api_key
+        self.rate_limiter = rate_limiter
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.default_model = default_model
+        self.max_concurrency = max_concurrency
+        self._models: Dict[str, "ChatGroq"] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        # Serialises multi-slot acquisitions so two batches cannot each hold part of the pool
+        self._slot_lock = asyncio.Lock()
+        self.stats = {'calls': 0, 'errors': 0, 'retries': 0, 'timeouts': 0, 'early_stops': 0, 'latency_total': 0.0}
+
+    def get_llm(self, model: Optional[str] = None) -> "ChatGroq":
+        """Shared chat model for ``model``, for use in chains"""
+        model = model or self.default_model
+        llm = self._models.get(model)
+        if llm is None:
+            # Deferred so importing the bot does not pull in the langchain stack
+            from langchain_groq import ChatGroq
+            # Retries and timeouts are handled by the gateway, not the client
+            llm = ChatGroq(api_key=self.api_key, model_name=model, max_retries=0, request_timeout=self.timeout)
+            self._models[model] = llm
+        return llm
+
+    @asynccontextmanager
+    async def _slots(self, count: int):
+        """Hold ``count`` concurrency slots"""
+        if count == 1:
+            async with self._semaphore:
+                yield
+            return
+        acquired = 0
+        try:
+            async with self._slot_lock:
+                for _ in range(count):
+                    await self._semaphore.acquire()
+                    acquired += 1
+            yield
+        finally:
+            for _ in range(acquired):
+                self._semaphore.release()
+
+    async def run(self, func: Callable, *args, cost: float = 1, slots: int = 1, **kwargs):
+        """Run an LLM coroutine function under the gateway's limits and retries.
+
+        ``slots`` is how many concurrent requests the call makes, e.g. a batch.
+        """
+        attempt = 0
+        while True:
+            start = time.monotonic()
+            try:
+                async with self._slots(slots):
+                    if self.rate_limiter is not None:
+                        result = await self.rate_limiter.call(
+                            'llm', lambda: asyncio.wait_for(func(*args, **kwargs), self.timeout), cost=cost
+                        )
+                    else:
+                        result = await asyncio.wait_for(func(*args, **kwargs), self.timeout)
+                self.stats['calls'] += 1
+                self.stats['latency_total'] += time.monotonic() - start
+                return result
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    self.stats['timeouts'] += 1
+                if attempt >= self.max_retries or not _is_retryable(e):
+                    self.stats['errors'] += 1
+                    raise
+                attempt += 1
+                self.stats['retries'] += 1
+                delay = min(30.0, 2 ** attempt) * random.uniform(0.5, 1.5)
+                logger.warning(f"LLM call failed ({e}), retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def batch(self, runnable, inputs: List, max_concurrency: Optional[int] = None) -> List:
+        """Run ``runnable.abatch`` over ``inputs`` in chunks of ``max_concurrency``.
+
+        ``max_concurrency`` is capped at the gateway's own limit, and each
+        chunk holds one gateway slot per item and is charged per item against
+        the ``llm`` budget. Failed items come back as exceptions in their slot
+        so callers can fall back item by item.
+        """
+        size = max(1, min(max_concurrency or self.max_concurrency, self.max_concurrency))
+        results: List = []
+        for i in range(0, len(inputs), size):
+            chunk = inputs[i:i + size]
+            try:
+                results.extend(await self.run(
+                    runnable.abatch, chunk, config={'max_concurrency': size}, return_exceptions=True,
+                    cost=len(chunk), slots=len(chunk)
+                ))
+            except Exception as e:
+                results.extend([e] * len(chunk))
+        return results
+
+    async def ainvoke(self, prompt, model: Optional[str] = None):
+        return await self.run(self.get_llm(model).ainvoke, prompt)
+
+    async def agenerate(self, messages, model: Optional[str] = None):
+        return await self.run(self.get_llm(model).agenerate, messages)
+
+    async def astream_text(self, prompt, max_graphemes: int, model: Optional[str] = None) -> str:
+        """Stream a completion and stop once it passes ``max_graphemes``, then trim it to fit"""
+        llm = self.get_llm(model)
+
+        async def consume() -> str:
+            text = ''
+            stream = llm.astream(prompt)
+            try:
+                async for chunk in stream:
+                    text += chunk.content or ''
+                    # Code points bound graphemes from above, so only segment once that bound is passed
+                    if len(text) > max_graphemes and grapheme_len(text.strip()) > max_graphemes:
+                        self.stats['early_stops'] += 1
+                        break
+            finally:
+                await stream.aclose()
+            return text
+
+        text = await self.run(consume)
+        return fit_post(text, max_graphemes)
+
+    def summary(self) -> Dict:
+        calls = self.stats['calls']
+        return dict(self.stats, avg_latency=self.stats['latency_total'] / calls if calls else 0.0)
+
+
+_gateway: Optional[LLMGateway] = None
+
+
+def get_llm_gateway() -> LLMGateway:
+    """Process-wide LLM gateway built from settings"""
+    global _gateway
+    if _gateway is None:
+        from config import get_settings
+        settings = get_settings()
+        _gateway = LLMGateway(
+            settings.GROQ_API_KEY,
+            rate_limiter=get_rate_limiter(),
+            max_concurrency=settings.LLM_MAX_CONCURRENCY,
+            timeout=settings.LLM_TIMEOUT,
+            max_retries=settings.LLM_MAX_RETRIES
+        )
+    return _gateway
@@ -0,0 +1,76 @@
+import asyncio
+import logging
+import zlib
+from typing import Awaitable, Callable, List, Set
+
+logger = logging.getLogger("mention_pipeline")
+
+
+class MentionPipeline:
+    """Bounded worker pool for mention processing.
+
+    Notifications are sharded by thread root, so mentions in the same thread
+    are handled in arrival order while different threads run concurrently.
+    Each shard queue is bounded and ``submit`` waits when it is full.
+    """
+
+    def __init__(self, handler: Callable[[object], Awaitable[None]], workers: int = 4, queue_size: int = 50):
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self.queues: List[asyncio.Queue] = []
+        self.pending: Set[str] = set()
+        self._tasks: List[asyncio.Task] = []
+
+    @staticmethod
+    def thread_key(notification) -> str:
+        """Return the root URI of the thread a notification belongs to"""
+        reply = getattr(getattr(notification, 'record', None), 'reply', None)
+        root = getattr(reply, 'root', None)
+        return getattr(root, 'uri', None) or notification.uri
+
+    def start(self):
+        if self._tasks:
+            return
+        self.queues = [asyncio.Queue(maxsize=self.queue_size) for _ in range(self.workers)]
+        self._tasks = [
+            asyncio.create_task(self._worker(queue), name=f"mention-worker-{idx}")
+            for idx, queue in enumerate(self.queues)
+        ]
+        logger.info(f"Started {self.workers} mention workers")
+
+    async def stop(self) -> List:
+        """Cancel the workers and return the queued notifications that were never started"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        dropped = []
+        for queue in self.queues:
+            while not queue.empty():
+                dropped.append(queue.get_nowait())
+        self.pending.clear()
+        return dropped
+
+    async def submit(self, notification) -> bool:
+        """Queue a notification, waiting for room if its shard is full"""
+        if notification.uri in self.pending:
+            return False
+        self.pending.add(notification.uri)
+        shard = zlib.crc32(self.thread_key(notification).encode()) % len(self.queues)
+        await self.queues[shard].put(notification)
+        return True
+
+    async def join(self):
+        await asyncio.gather(*(queue.join() for queue in self.queues))
+
+    async def _worker(self, queue: asyncio.Queue):
+        while True:
+            notification = await queue.get()
+            try:
+                await self.handler(notification)
+            except Exception as e:
+                logger.error(f"Mention worker error: {e}")
+            finally:
+                self.pending.discard(notification.uri)
+                queue.task_done()
@@ -0,0 +1,253 @@
+import json
+import logging
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Optional
+
+from utils.simhash import BAND_SCHEME, MAX_DISTANCE, band_keys, hamming, simhash, to_signed, to_unsigned
+
+logger = logging.getLogger("news_store")
+
+_COLUMNS = ('url', 'title', 'content', 'source', 'timestamp', 'score')
+
+
+class NewsStore:
+    """Indexed SQLite store for scraped news items.
+
+    Items are unique by URL and upserted incrementally, so a scrape only
+    writes the rows it touched. Source, timestamp and unposted-by-score
+    indexes keep the feed-browsing queries and "what to post next" lookups
+    to an index walk instead of reloading and sorting the whole cache.
+
+    New items are fingerprinted with SimHash and looked up through LSH
+    tables keyed on 16-bit block pairs; an item within ``max_distance`` bits
+    of an earlier one joins that item's cluster (``duplicate_of``) and is
+    never offered for posting. Any ``max_distance`` up to 6 is found without
+    misses (trivial rewrites land around 4 bits; unrelated items in the
+    legacy cache sit 12 or more apart), and each lookup reads a handful of
+    rows per table rather than a fixed fraction of the store.
+    """
+
+    def __init__(self, path: str = 'news.db', legacy_file: str = 'daily_news_cache.json',
+                 max_distance: int = MAX_DISTANCE):
+        self.max_distance = min(max_distance, MAX_DISTANCE)
+        self.duplicates = 0
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS news_items (
+                url TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                content TEXT NOT NULL,
+                source TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                score REAL NOT NULL DEFAULT 0,
+                scraped_at REAL NOT NULL,
+                posted_at REAL,
+                simhash INTEGER,
+                duplicate_of TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_news_source_ts ON news_items(source, timestamp);
+            CREATE INDEX IF NOT EXISTS idx_news_ts ON news_items(timestamp);
+            CREATE TABLE IF NOT EXISTS news_bands (
+                band INTEGER NOT NULL,
+                key INTEGER NOT NULL,
+                url TEXT NOT NULL,
+                PRIMARY KEY (band, key, url)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_news_bands_url ON news_bands(url);
+            CREATE TABLE IF NOT EXISTS news_meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(news_items)")}
+        if 'simhash' not in columns:
+            # Stores created before duplicate detection
+            self.conn.execute("ALTER TABLE news_items ADD COLUMN simhash INTEGER")
+            self.conn.execute("ALTER TABLE news_items ADD COLUMN duplicate_of TEXT")
+        self.conn.executescript("""
+            DROP INDEX IF EXISTS idx_news_unposted_score;
+            CREATE INDEX IF NOT EXISTS idx_news_postable_score ON news_items(score)
+                WHERE posted_at IS NULL AND duplicate_of IS NULL;
+            CREATE INDEX IF NOT EXISTS idx_news_cluster ON news_items(duplicate_of) WHERE duplicate_of IS NOT NULL;
+        """)
+        self.conn.commit()
+        self._rebuild_bands()
+        self._backfill_fingerprints()
+        self._import_legacy(legacy_file)
+
+    def _backfill_fingerprints(self):
+        """Fingerprint rows stored before duplicate detection existed, oldest first"""
+        rows = self.conn.execute(
+            "SELECT url, title, content FROM news_items WHERE simhash IS NULL ORDER BY scraped_at"
+        ).fetchall()
+        if not rows:
+            return
+        with self.conn:
+            for row in rows:
+                fingerprint = simhash(f"{row['title']}\n{row['content']}")
+                self._index(row['url'], fingerprint, self._find_duplicate(fingerprint, exclude=row['url']))
+        logger.info(f"Fingerprinted {len(rows)} stored news items")
+
+    def _rebuild_bands(self):
+        """Re-key the band table for stored fingerprints when the band layout changed"""
+        row = self.conn.execute("SELECT value FROM news_meta WHERE key = 'band_scheme'").fetchone()
+        if row and row[0] == BAND_SCHEME:
+            return
+        with self.conn:
+            self.conn.execute("DELETE FROM news_bands")
+            for item in self.conn.execute("SELECT url, simhash FROM news_items WHERE simhash IS NOT NULL").fetchall():
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO news_bands (band, key, url) VALUES (?, ?, ?)",
+                    ((band, key, item['url']) for band, key in enumerate(band_keys(to_unsigned(item['simhash']))))
+                )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO news_meta (key, value) VALUES ('band_scheme', ?)", (BAND_SCHEME,)
+            )
+
+    def _import_legacy(self, legacy_file: str):
+        """One-time migration from the old JSON cache"""
+        if not legacy_file or len(self):
+            return
+        try:
+            with open(legacy_file, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.error(f"Error reading legacy news cache: {e}")
+            return
+        count = self.upsert(data.get('news_items', []))
+        if data.get('last_scrape_date'):
+            self.last_scrape_date = data['last_scrape_date']
+        logger.info(f"Imported {count} news items from {legacy_file}")
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM news_items").fetchone()[0]
+
+    def __contains__(self, url: str) -> bool:
+        return self.conn.execute("SELECT 1 FROM news_items WHERE url = ?", (url,)).fetchone() is not None
+
+    @property
+    def last_scrape_date(self) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM news_meta WHERE key = 'last_scrape_date'").fetchone()
+        return row[0] if row else None
+
+    @last_scrape_date.setter
+    def last_scrape_date(self, value: str):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO news_meta (key, value) VALUES ('last_scrape_date', ?)", (value,)
+            )
+
+    def _find_duplicate(self, fingerprint: int, exclude: Optional[str] = None) -> Optional[str]:
+        """Cluster head of the closest stored item within ``max_distance`` bits, via LSH bands"""
+        best = None
+        for band, key in enumerate(band_keys(fingerprint)):
+            rows = self.conn.execute("""
+                SELECT n.url, n.simhash, n.duplicate_of FROM news_bands b
+                JOIN news_items n ON n.url = b.url
+                WHERE b.band = ? AND b.key = ? AND n.simhash IS NOT NULL
+            """, (band, key))
+            for row in rows:
+                if row['url'] == exclude:
+                    continue
+                distance = hamming(fingerprint, to_unsigned(row['simhash']))
+                if distance <= self.max_distance and (best is None or distance < best[0]):
+                    best = (distance, row['duplicate_of'] or row['url'])
+        return best[1] if best else None
+
+    def _index(self, url: str, fingerprint: int, duplicate_of: Optional[str]):
+        self.conn.execute(
+            "UPDATE news_items SET simhash = ?, duplicate_of = ? WHERE url = ?",
+            (to_signed(fingerprint), duplicate_of, url)
+        )
+        self.conn.execute("DELETE FROM news_bands WHERE url = ?", (url,))
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO news_bands (band, key, url) VALUES (?, ?, ?)",
+            ((band, key, url) for band, key in enumerate(band_keys(fingerprint)))
+        )
+        if duplicate_of:
+            self.duplicates += 1
+
+    def upsert(self, items: Iterable[Dict]) -> int:
+        """Insert new items and refresh existing ones by URL; posting and cluster state is kept.
+
+        New items are checked against the fingerprint index (including items
+        earlier in the same batch) and clustered under any near-duplicate.
+        """
+        now = time.time()
+        count = 0
+        with self.conn:
+            for item in items:
+                url = item.get('url')
+                if not url:
+                    continue
+                count += 1
+                row = (url, item.get('title', ''), item.get('content', ''), item.get('source', ''),
+                       item.get('timestamp', ''), item.get('score', 0), now)
+                if url in self:
+                    # Fingerprint and cluster stay as first ingested
+                    self.conn.execute("""
+                        UPDATE news_items SET title = ?, content = ?, source = ?, timestamp = ?, score = ?,
+                            scraped_at = ?
+                        WHERE url = ?
+                    """, row[1:] + (url,))
+                    continue
+                fingerprint = simhash(f"{row[1]}\n{row[2]}")
+                self.conn.execute("""
+                    INSERT INTO news_items (url, title, content, source, timestamp, score, scraped_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, row)
+                self._index(url, fingerprint, self._find_duplicate(fingerprint, exclude=url))
+        return count
+
+    def cluster(self, url: str) -> List[Dict]:
+        """Every stored copy of the story ``url`` belongs to, cluster head first"""
+        row = self.conn.execute("SELECT duplicate_of FROM news_items WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return []
+        head = row['duplicate_of'] or url
+        rows = self.conn.execute(
+            "SELECT * FROM news_items WHERE url = ? OR duplicate_of = ? ORDER BY duplicate_of IS NOT NULL, scraped_at",
+            (head, head)
+        )
+        return [self._to_dict(row) for row in rows]
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict:
+        return {column: row[column] for column in _COLUMNS}
+
+    def top_k(self, k: int = 10, unposted_only: bool = True) -> List[Dict]:
+        """Highest-scoring items, read straight off the score index; unposted excludes duplicates"""
+        if unposted_only:
+            query = "SELECT * FROM news_items WHERE posted_at IS NULL AND duplicate_of IS NULL ORDER BY score DESC LIMIT ?"
+        else:
+            query = "SELECT * FROM news_items ORDER BY score DESC LIMIT ?"
+        return [self._to_dict(row) for row in self.conn.execute(query, (k,))]
+
+    def by_source(self, source: str, limit: int = 20, since: Optional[str] = None) -> List[Dict]:
+        """Newest items from one source, optionally only those after ``since``"""
+        rows = self.conn.execute(
+            "SELECT * FROM news_items WHERE source = ? AND timestamp > ? ORDER BY timestamp DESC LIMIT ?",
+            (source, since or '', limit)
+        )
+        return [self._to_dict(row) for row in rows]
+
+    def recent(self, limit: int = 20, since: Optional[str] = None) -> List[Dict]:
+        rows = self.conn.execute(
+            "SELECT * FROM news_items WHERE timestamp > ? ORDER BY timestamp DESC LIMIT ?",
+            (since or '', limit)
+        )
+        return [self._to_dict(row) for row in rows]
+
+    def next_to_post(self) -> Optional[Dict]:
+        items = self.top_k(1)
+        return items[0] if items else None
+
+    def mark_posted(self, url: str):
+        with self.conn:
+            self.conn.execute("UPDATE news_items SET posted_at = ? WHERE url = ?", (time.time(), url))
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,158 @@
+import json
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("notification_poller")
+
+
+def _parse_ts(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+class NotificationPoller:
+    """Incremental notification polling with a persisted seenAt watermark.
+
+    Each poll pages through listNotifications with the cursor until it
+    reaches notifications at or before the watermark, so nothing is lost
+    during spikes and nothing old is fetched twice. The poll interval halves
+    while new notifications keep arriving and grows back when idle.
+
+    The watermark only moves past notifications reported done through
+    ``complete``; queued ones survive a restart and failed ones are
+    returned again by the next poll (up to ``max_attempts``). Items are
+    only claimed once every page of a poll has been fetched, and callers
+    ``release`` items they dropped without handling. It is kept
+    as a timestamp plus the URIs already done at exactly that timestamp,
+    so notifications sharing it are not dropped.
+    """
+
+    QUEUED, DONE, FAILED = 'queued', 'done', 'failed'
+
+    def __init__(self, api, state_file: str = 'notification_state.json', page_size: int = 50,
+                 max_pages: int = 10, min_interval: float = 5, max_interval: float = 60, max_attempts: int = 3):
+        self.api = api
+        self.state_file = state_file
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_attempts = max_attempts
+        self.interval = max_interval / 2
+        self.seen_at: Optional[str] = None
+        self.seen_uris: List[str] = []
+        # Notifications polled past the watermark: uri -> [indexed_at, state, attempts]
+        self.window: Dict[str, list] = {}
+        self._load_state()
+
+    def _load_state(self):
+        try:
+            with open(self.state_file, 'r') as f:
+                state = json.load(f)
+            self.seen_at = state.get('seen_at')
+            self.seen_uris = state.get('seen_uris', [])
+        except FileNotFoundError:
+            self.seen_at = None
+        except Exception as e:
+            logger.error(f"Error loading notification state: {e}")
+
+    def _save_state(self):
+        try:
+            with open(self.state_file, 'w') as f:
+                json.dump({'seen_at': self.seen_at, 'seen_uris': self.seen_uris}, f)
+        except Exception as e:
+            logger.error(f"Error saving notification state: {e}")
+
+    def _is_new(self, notification) -> bool:
+        if not self.seen_at:
+            return True
+        indexed_at, seen_at = _parse_ts(notification.indexed_at), _parse_ts(self.seen_at)
+        return indexed_at > seen_at or (indexed_at == seen_at and notification.uri not in self.seen_uris)
+
+    def _claim(self, notification) -> bool:
+        """Record a polled notification; False if it is already queued or done"""
+        entry = self.window.get(notification.uri)
+        if entry is None:
+            self.window[notification.uri] = [notification.indexed_at, self.QUEUED, 0]
+            return True
+        if entry[1] == self.FAILED:
+            entry[1] = self.QUEUED
+            return True
+        return False
+
+    async def poll(self) -> List:
+        """Return notifications newer than the watermark, oldest first; a failed page claims nothing"""
+        fresh_items = []
+        cursor = None
+        # Without a watermark only the latest page is considered, not the full history
+        max_pages = self.max_pages if self.seen_at else 1
+
+        for _ in range(max_pages):
+            params = {'limit': self.page_size}
+            if cursor:
+                params['cursor'] = cursor
+            response = await self.api.app.bsky.notification.list_notifications(params)
+            page = response.notifications or []
+            fresh = [n for n in page if self._is_new(n)]
+            fresh_items.extend(fresh)
+            cursor = getattr(response, 'cursor', None)
+            if not cursor or len(fresh) < len(page):
+                break
+        else:
+            if self.seen_at:
+                logger.warning(f"Notification backlog exceeds {max_pages} pages; older items skipped")
+
+        new_items = [n for n in reversed(fresh_items) if self._claim(n)]
+        return new_items
+
+    def complete(self, uri: str, success: bool = True):
+        """Report a polled notification as handled, or as failed so it is polled again"""
+        entry = self.window.get(uri)
+        if entry is None:
+            return
+        if success:
+            entry[1] = self.DONE
+            return
+        entry[2] += 1
+        if entry[2] >= self.max_attempts:
+            logger.error(f"Giving up on notification {uri} after {entry[2]} attempts")
+            entry[1] = self.DONE
+        else:
+            entry[1] = self.FAILED
+
+    def release(self, uri: str):
+        """Hand back a claimed notification that was dropped unhandled; the next poll returns it again"""
+        entry = self.window.get(uri)
+        if entry is not None and entry[1] == self.QUEUED:
+            entry[1] = self.FAILED
+
+    async def mark_seen(self):
+        """Advance the watermark past the oldest run of completed notifications and sync updateSeen"""
+        entries = sorted(self.window.items(), key=lambda item: _parse_ts(item[1][0]))
+        seen_at, seen_uris = self.seen_at, list(self.seen_uris)
+        for uri, (indexed_at, state, _) in entries:
+            if state != self.DONE:
+                break
+            if indexed_at != seen_at:
+                seen_at, seen_uris = indexed_at, []
+            seen_uris.append(uri)
+            del self.window[uri]
+        if seen_at == self.seen_at and seen_uris == self.seen_uris:
+            return
+        moved = seen_at != self.seen_at
+        self.seen_at, self.seen_uris = seen_at, seen_uris
+        self._save_state()
+        if not moved:
+            return
+        try:
+            await self.api.app.bsky.notification.update_seen({'seenAt': seen_at})
+        except Exception as e:
+            logger.error(f"updateSeen failed: {e}")
+
+    def next_interval(self, new_count: int) -> float:
+        """Shrink the interval under load and back off when idle"""
+        if new_count:
+            self.interval = max(self.min_interval, self.interval / 2)
+        else:
+            self.interval = min(self.max_interval, self.interval * 1.5)
+        return self.interval
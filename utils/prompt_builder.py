@@ -0,0 +1,81 @@
+import logging
+import math
+import re
+from typing import Dict, List, Sequence, Tuple
+
+logger = logging.getLogger("prompt_builder")
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+_WORD_RE = re.compile(r"\w+")
+
+
+def count_tokens(text: str) -> int:
+    """Approximate BPE token count: words split into ~4 character pieces, punctuation counted singly"""
+    return sum(math.ceil(len(tok) / 4) for tok in _TOKEN_RE.findall(text or ''))
+
+
+def relevance(text: str, query: str) -> float:
+    """Jaccard word overlap between a context piece and the query"""
+    a = set(_WORD_RE.findall((text or '').lower()))
+    b = set(_WORD_RE.findall((query or '').lower()))
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class PromptAssembler:
+    """Fits ranked optional context into a token budget around a fixed head and tail.
+
+    Sections are ``(title, [(score, text), ...])``. Pieces are admitted
+    highest score first until the budget is spent, then rendered in their
+    original order under their section title. Per-prompt sizes are logged
+    and running totals kept in ``stats``.
+    """
+
+    def __init__(self, budget: int = 1200):
+        self.budget = budget
+        self.stats = {'prompts': 0, 'tokens': 0, 'dropped': 0, 'over_budget': 0}
+
+    def build(self, head: str, tail: str, sections: Sequence[Tuple[str, List[Tuple[float, str]]]]) -> Tuple[str, Dict]:
+        used = count_tokens(head) + count_tokens(tail)
+        candidates = [
+            (score, s_idx, p_idx, text)
+            for s_idx, (_, pieces) in enumerate(sections)
+            for p_idx, (score, text) in enumerate(pieces)
+        ]
+        candidates.sort(key=lambda c: (-c[0], c[1], c[2]))
+
+        selected = set()
+        titled = set()
+        dropped = 0
+        for score, s_idx, p_idx, text in candidates:
+            cost = count_tokens(text)
+            if s_idx not in titled:
+                cost += count_tokens(sections[s_idx][0])
+            if used + cost > self.budget:
+                dropped += 1
+                continue
+            used += cost
+            titled.add(s_idx)
+            selected.add((s_idx, p_idx))
+
+        parts = [head]
+        for s_idx, (title, pieces) in enumerate(sections):
+            chosen = [text for p_idx, (_, text) in enumerate(pieces) if (s_idx, p_idx) in selected]
+            if chosen:
+                parts.append(title + ''.join(chosen))
+        parts.append(tail)
+        prompt = ''.join(parts)
+
+        info = {'tokens': used, 'budget': self.budget, 'included': len(selected), 'dropped': dropped}
+        self.stats['prompts'] += 1
+        self.stats['tokens'] += used
+        self.stats['dropped'] += dropped
+        if used > self.budget:
+            self.stats['over_budget'] += 1
+        logger.info(f"Prompt size {used}/{self.budget} tokens, {len(selected)} context pieces, {dropped} dropped")
+        return prompt, info
+
+    def summary(self) -> Dict:
+        prompts = self.stats['prompts']
+        return dict(self.stats, avg_tokens=self.stats['tokens'] / prompts if prompts else 0.0)
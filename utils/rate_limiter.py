@@ -0,0 +1,143 @@
+import asyncio
+import logging
+import re
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger("rate_limiter")
+
+_POLICY_RE = re.compile(r'^\s*(\d+)\s*;\s*w=(\d+)')
+# Client methods that create, update or delete repo records
+_RECORD_WRITES = ('apply_writes', 'create_record', 'put_record', 'delete_record')
+
+
+def _header(headers, name: str) -> Optional[str]:
+    if not headers:
+        return None
+    try:
+        return headers.get(name)
+    except Exception:
+        return None
+
+
+def _to_float(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Token bucket with a hard block window for server-imposed backoff"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, cost: float = 1):
+        """Wait for ``cost`` tokens; costs above capacity run once the bucket is full"""
+        async with self._lock:
+            needed = min(cost, self.capacity)
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                wait = max(0.0, self.blocked_until - now)
+                if not wait and self.tokens >= needed:
+                    self.tokens -= cost
+                    return
+                wait = max(wait, (needed - self.tokens) / self.rate)
+                await asyncio.sleep(wait)
+
+    def block_for(self, seconds: float):
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.tokens = min(self.tokens, 0)
+
+
+class RateLimiter:
+    """Shared per-endpoint-class budgets (read, write, llm) for every loop.
+
+    Budgets are token buckets; rate-limit headers on failed responses
+    (ATProto ``ratelimit-*`` / Groq ``x-ratelimit-*`` and ``retry-after``)
+    tighten them until the server-side window resets.
+    """
+
+    def __init__(self, budgets: Dict[str, Tuple[float, float]]):
+        self.buckets = {name: TokenBucket(rate, capacity) for name, (rate, capacity) in budgets.items()}
+
+    @staticmethod
+    def classify(method_name: str) -> str:
+        """Map an ATProto client method name to an endpoint class.
+
+        Only repo record writes draw on the ``write`` budget, which is sized
+        for the PDS record-creation limit; everything else (reads, updateSeen,
+        session calls) is ``read``.
+        """
+        if method_name in _RECORD_WRITES:
+            return 'write'
+        return 'read'
+
+    async def acquire(self, endpoint_class: str, cost: float = 1):
+        bucket = self.buckets.get(endpoint_class)
+        if bucket is not None:
+            await bucket.acquire(cost)
+
+    def update_from_headers(self, endpoint_class: str, headers):
+        """Adjust a budget from rate-limit response headers"""
+        bucket = self.buckets.get(endpoint_class)
+        if bucket is None or not headers:
+            return
+
+        policy = _POLICY_RE.match(_header(headers, 'ratelimit-policy') or '')
+        if policy and int(policy.group(2)):
+            bucket.rate = min(bucket.rate, int(policy.group(1)) / int(policy.group(2)))
+
+        remaining = _to_float(_header(headers, 'ratelimit-remaining') or
+                              _header(headers, 'x-ratelimit-remaining-requests'))
+        if remaining is not None:
+            bucket.tokens = min(bucket.tokens, remaining)
+
+        retry_after = _to_float(_header(headers, 'retry-after'))
+        reset = _to_float(_header(headers, 'ratelimit-reset'))
+        if retry_after is None and reset is not None and remaining == 0:
+            retry_after = reset - time.time()
+        if retry_after and retry_after > 0:
+            logger.warning(f"Rate limited on {endpoint_class}, backing off {retry_after:.1f}s")
+            bucket.block_for(retry_after)
+
+    async def call(self, endpoint_class: str, func: Callable[..., Awaitable], *args, cost: float = 1, **kwargs):
+        """Run ``func`` inside the budget, feeding error headers back into it"""
+        await self.acquire(endpoint_class, cost)
+        try:
+            return await func(*args, **kwargs)
+        except Exception as e:
+            response = getattr(e, 'response', None)
+            content = getattr(response, 'content', None)
+            headers = getattr(response, 'headers', None) or getattr(content, 'headers', None)
+            if headers:
+                self.update_from_headers(endpoint_class, headers)
+            raise
+
+
+_rate_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide limiter shared by the ATProto transport and the LLM gateway"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        from config import get_settings
+        settings = get_settings()
+        _rate_limiter = RateLimiter({
+            'read': (settings.RATE_LIMIT_READ_PER_SEC, settings.RATE_LIMIT_READ_BURST),
+            'write': (settings.RATE_LIMIT_WRITE_PER_SEC, settings.RATE_LIMIT_WRITE_BURST),
+            'llm': (settings.RATE_LIMIT_LLM_PER_SEC, settings.RATE_LIMIT_LLM_BURST)
+        })
+    return _rate_limiter
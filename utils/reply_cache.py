@@ -0,0 +1,87 @@
+import hashlib
+import random
+import re
+from typing import Optional
+
+from utils.cache import LRUCache
+from utils.text import normalize_text
+
+# Interchangeable phrases used to vary cached replies
+_SWAPS = [
+    ['bestie', 'fam', 'friend'],
+    ['fr fr', 'for real', 'deadass'],
+    ['no cap', 'for real tho', 'honestly'],
+    ['you got this', "you've got this", 'you got this fr'],
+    ["it's giving", 'giving'],
+]
+_OPENERS = ['ok so', 'real talk:', 'hear me out:', 'lowkey,']
+_SWAP_PATTERNS = [
+    (group, phrase, re.compile(r"(?<![\w'])" + re.escape(phrase) + r"(?![\w'])", re.IGNORECASE))
+    for group in _SWAPS for phrase in group
+]
+
+
+def _match_case(source: str, replacement: str) -> str:
+    if source.isupper() and len(source) > 1:
+        return replacement.upper()
+    if source[:1].isupper():
+        return replacement[:1].upper() + replacement[1:]
+    return replacement
+
+
+class ReplyCache:
+    """Reply reuse for near-identical mentions under the same parent post.
+
+    Keys combine a hash of the parent key (the parent post's URI plus any
+    extra context) with a normalized form of the mention (case, handles,
+    URLs and punctuation removed), so a viral thread full of "@bot is this
+    true??" mentions triggers one LLM call. Mentions without a parent are
+    never cached. With ``vary`` enabled, hits are lightly reworded before
+    reuse.
+    """
+
+    def __init__(self, maxsize: int = 512, ttl: float = 1800, vary: bool = True):
+        self.cache = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.vary = vary
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return normalize_text(text)
+
+    def key(self, parent_key: str, mention_text: str) -> str:
+        parent_hash = hashlib.sha256(parent_key.encode()).hexdigest()[:16]
+        mention_hash = hashlib.sha256(self.normalize(mention_text).encode()).hexdigest()[:16]
+        return f"{parent_hash}:{mention_hash}"
+
+    def get(self, parent_key: Optional[str], mention_text: str) -> Optional[str]:
+        if not parent_key:
+            return None
+        reply = self.cache.get(self.key(parent_key, mention_text))
+        if reply is None:
+            return None
+        return self.vary_reply(reply) if self.vary else reply
+
+    def set(self, parent_key: Optional[str], mention_text: str, reply: str):
+        if parent_key:
+            self.cache.set(self.key(parent_key, mention_text), reply)
+
+    @staticmethod
+    def vary_reply(reply: str) -> str:
+        """Swap one whole-word slang phrase for an equivalent, or add an opener"""
+        matches = [
+            (group, phrase, match)
+            for group, phrase, pattern in _SWAP_PATTERNS for match in pattern.finditer(reply)
+        ]
+        # "giving" inside "it's giving" is part of the longer phrase, not a swap of its own
+        candidates = [
+            (group, phrase, match) for group, phrase, match in matches
+            if not any(
+                other.start() <= match.start() and match.end() <= other.end() and other.span() != match.span()
+                for _, _, other in matches
+            )
+        ]
+        if candidates:
+            group, phrase, match = random.choice(candidates)
+            replacement = _match_case(match.group(0), random.choice([p for p in group if p != phrase]))
+            return reply[:match.start()] + replacement + reply[match.end():]
+        return f"{random.choice(_OPENERS)} {reply[:1].lower()}{reply[1:]}"
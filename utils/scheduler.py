@@ -0,0 +1,141 @@
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import random
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("scheduler")
+
+
+class Job:
+    """A periodic coroutine job.
+
+    ``func`` may return a number of seconds to override the delay before its
+    next run (used for adaptive polling). ``missed`` decides what happens
+    when a persisted run time has already passed at startup: ``'run_once'``
+    runs it immediately, ``'skip'`` moves it to the next future slot.
+    """
+
+    def __init__(self, name: str, func: Callable[[], Awaitable[Optional[float]]], interval: float,
+                 jitter: float = 0.0, missed: str = 'run_once', persist: bool = True):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.missed = missed
+        self.persist = persist
+        self.next_run = 0.0
+        self.running = False
+
+    def delay(self, override: Optional[float] = None) -> float:
+        base = override if isinstance(override, (int, float)) and override > 0 else self.interval
+        return base + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+
+
+class JobScheduler:
+    """Heap-based scheduler for all periodic bot jobs.
+
+    Next-run times are persisted to ``state_file`` so restarts neither
+    re-run jobs that just ran (e.g. double posting) nor lose their place.
+    The loop sleeps until the earliest job is due instead of polling.
+    """
+
+    def __init__(self, state_file: str = 'scheduler_state.json'):
+        self.state_file = state_file
+        self.jobs: Dict[str, Job] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._tasks = set()
+        self._state = self._load_state()
+
+    def _load_state(self) -> Dict[str, float]:
+        try:
+            with open(self.state_file, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.error(f"Error loading scheduler state: {e}")
+            return {}
+
+    def _save_state(self):
+        state = {name: job.next_run for name, job in self.jobs.items() if job.persist}
+        try:
+            with open(self.state_file, 'w') as f:
+                json.dump(state, f)
+        except Exception as e:
+            logger.error(f"Error saving scheduler state: {e}")
+
+    def _push(self, job: Job):
+        heapq.heappush(self._heap, (job.next_run, next(self._counter), job.name))
+        self._wakeup.set()
+
+    def add_job(self, name: str, func: Callable[[], Awaitable[Optional[float]]], interval: float,
+                jitter: float = 0.0, missed: str = 'run_once', first_run_in: float = 0.0, persist: bool = True):
+        if name in self.jobs:
+            return
+        job = Job(name, func, interval, jitter=jitter, missed=missed, persist=persist)
+        now = time.time()
+        saved = self._state.get(name) if persist else None
+        if saved is None:
+            job.next_run = now + first_run_in
+        elif saved >= now:
+            job.next_run = saved
+        elif missed == 'skip':
+            missed_slots = int((now - saved) // interval) + 1
+            job.next_run = saved + missed_slots * interval
+        else:
+            job.next_run = now
+        self.jobs[name] = job
+        self._push(job)
+
+    async def run(self):
+        while True:
+            if not self._heap:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            next_run, _, name = self._heap[0]
+            job = self.jobs.get(name)
+            if job is None or next_run != job.next_run:
+                # Stale heap entry from a reschedule
+                heapq.heappop(self._heap)
+                continue
+
+            delay = next_run - time.time()
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self._heap)
+            if job.running:
+                continue
+            # Persist the next slot before running so a crash mid-run cannot repeat it
+            job.next_run = time.time() + job.delay()
+            self._save_state()
+            task = asyncio.create_task(self._run_job(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_job(self, job: Job):
+        job.running = True
+        started = time.time()
+        override = None
+        try:
+            override = await job.func()
+        except Exception as e:
+            logger.error(f"Job {job.name} failed: {e}")
+        finally:
+            job.running = False
+        job.next_run = started + job.delay(override) if override else job.next_run
+        self._save_state()
+        self._push(job)
@@ -0,0 +1,127 @@
+import base64
+import json
+import logging
+import os
+import time
+from typing import List, Optional
+
+logger = logging.getLogger("session")
+
+
+def jwt_expiry(token: str) -> Optional[float]:
+    """Read the exp claim of a JWT without verifying it"""
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))['exp'])
+    except Exception:
+        return None
+
+
+class SessionManager:
+    """Single login path for the atproto Client.
+
+    The client refreshes its own tokens (rotating the refresh JWT) inside
+    any call made within 15 minutes of expiry. This class never runs a
+    second refresh alongside it: ``maintain`` only triggers the client's
+    own refresh when no call has done so, and persists the live session to
+    ``session_file`` whenever it changes, so restarts resume the current
+    tokens instead of doing a password login.
+    """
+
+    def __init__(self, client, handle: str, password: str, session_file: str = 'session.json',
+                 refresh_margin: float = 900):
+        self.client = client
+        self.handle = handle
+        self.password = password
+        self.session_file = session_file
+        # Matches the window in which the client refreshes on its own
+        self.refresh_margin = refresh_margin
+        self.session_string: Optional[str] = None
+
+    @property
+    def did(self) -> Optional[str]:
+        me = getattr(self.client, 'me', None)
+        return getattr(me, 'did', None)
+
+    def _live_session(self) -> Optional[str]:
+        try:
+            return self.client.export_session_string()
+        except Exception:
+            return None
+
+    def _tokens(self) -> List[str]:
+        """JWTs in the client's live session: access token first, then refresh"""
+        parts = (self._live_session() or '').split(':::')
+        return [part for part in parts if part.startswith('eyJ') and part.count('.') == 2]
+
+    @property
+    def access_jwt(self) -> Optional[str]:
+        tokens = self._tokens()
+        return tokens[0] if tokens else None
+
+    @property
+    def refresh_jwt(self) -> Optional[str]:
+        tokens = self._tokens()
+        return tokens[1] if len(tokens) > 1 else None
+
+    def _load(self) -> Optional[str]:
+        try:
+            with open(self.session_file, 'r') as f:
+                return json.load(f).get('session')
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Error loading session: {e}")
+            return None
+
+    def persist(self) -> bool:
+        """Write the client's live session to disk if it changed; True when written"""
+        live = self._live_session()
+        if not live or live == self.session_string:
+            return False
+        self.session_string = live
+        try:
+            with open(self.session_file, 'w') as f:
+                json.dump({'session': live}, f)
+            os.chmod(self.session_file, 0o600)
+        except Exception as e:
+            logger.error(f"Error saving session: {e}")
+        return True
+
+    def login(self):
+        """Resume the saved session if it is still usable, else log in with the password"""
+        saved = self._load()
+        if saved:
+            try:
+                # An expired access JWT is refreshed by the client during this login
+                self.client.login(session_string=saved)
+                self.session_string = saved
+                self.persist()
+                logger.info("Resumed saved session")
+                return
+            except Exception as e:
+                logger.warning(f"Saved session rejected, logging in again: {e}")
+        self.client.login(self.handle, self.password)
+        self.persist()
+
+    def maintain(self):
+        """Refresh through the client if it is due and idle, then persist any new tokens"""
+        try:
+            # Same lock and check the client uses before each call, so the two never both refresh
+            with self.client._refresh_lock:
+                if self.client._access_jwt and self.client._should_refresh_session():
+                    self.client._refresh_and_set_session()
+                    logger.info("Session refreshed")
+        except Exception as e:
+            logger.warning(f"Session refresh failed, logging in again: {e}")
+            self.login()
+            return
+        if self.persist():
+            logger.info("Saved rotated session tokens")
+
+    def seconds_until_refresh(self) -> float:
+        expiry = jwt_expiry(self.access_jwt or '')
+        if expiry is None:
+            return 600
+        return max(0.0, expiry - time.time() - self.refresh_margin)
@@ -0,0 +1,63 @@
+import hashlib
+from collections import Counter
+from itertools import combinations
+from typing import List
+
+from utils.text import normalize_text
+
+BITS = 64
+BLOCKS = 8
+BLOCK_BITS = BITS // BLOCKS
+_BLOCK_MASK = (1 << BLOCK_BITS) - 1
+# Each LSH table is keyed on a pair of blocks, i.e. 16-bit keys
+BAND_PAIRS = list(combinations(range(BLOCKS), 2))
+MAX_DISTANCE = BLOCKS - 2
+# Identifies the key layout, so stored band rows are rebuilt when it changes
+BAND_SCHEME = f"pairs-{BLOCKS}x{BLOCK_BITS}"
+
+
+def _features(text: str) -> Counter:
+    tokens = normalize_text(text).split()
+    # Word bigrams keep some ordering; unigrams cover very short texts
+    return Counter(tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])])
+
+
+def _hash(feature: str) -> int:
+    # blake2b rather than hash() so fingerprints are stable across processes
+    return int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), 'big')
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash of ``text``; similar texts differ in few bits"""
+    weights = [0] * BITS
+    for feature, count in _features(text).items():
+        h = _hash(feature)
+        for bit in range(BITS):
+            weights[bit] += count if h >> bit & 1 else -count
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def hamming(a: int, b: int) -> int:
+    return bin((a ^ b) & ((1 << BITS) - 1)).count('1')
+
+
+def band_keys(fingerprint: int) -> List[int]:
+    """LSH keys for a fingerprint, one per table in ``BAND_PAIRS``.
+
+    The fingerprint is cut into ``BLOCKS`` blocks and each table is keyed
+    on one pair of them. Two fingerprints within ``MAX_DISTANCE`` bits
+    differ in at most that many blocks, so at least two blocks match and
+    the table for that pair holds both: exact key lookups find every such
+    neighbour. With 16-bit keys a bucket holds about n / 65536 unrelated
+    items, so a lookup checks a few dozen candidates at 10^5 items.
+    """
+    blocks = [(fingerprint >> (i * BLOCK_BITS)) & _BLOCK_MASK for i in range(BLOCKS)]
+    return [blocks[i] << BLOCK_BITS | blocks[j] for i, j in BAND_PAIRS]
+
+def to_signed(fingerprint: int) -> int:
+    """Fit an unsigned 64-bit fingerprint into an SQLite INTEGER"""
+    return fingerprint - (1 << BITS) if fingerprint >= 1 << (BITS - 1) else fingerprint
+
+
+def to_unsigned(value: int) -> int:
+    return value & ((1 << BITS) - 1)
@@ -0,0 +1,89 @@
+import re
+import unicodedata
+from typing import List
+
+ZWJ = '\u200d'
+_MENTION_RE = re.compile(r'@[\w.\-]+')
+_URL_RE = re.compile(r'https?://\S+')
+_PUNCT_RE = re.compile(r"[^\w\s']")
+_SPACE_RE = re.compile(r'\s+')
+_SENTENCE_END_RE = re.compile(r'[.!?…](?:["\')\]]*)(?=\s|$)')
+
+
+def _is_extend(char: str) -> bool:
+    """Characters that attach to the preceding grapheme cluster"""
+    code = ord(char)
+    return (
+        unicodedata.category(char) in ('Mn', 'Me', 'Mc')
+        or 0xFE00 <= code <= 0xFE0F          # variation selectors
+        or 0xE0100 <= code <= 0xE01EF        # variation selectors supplement
+        or 0x1F3FB <= code <= 0x1F3FF        # emoji skin tone modifiers
+        or 0xE0020 <= code <= 0xE007F        # emoji tag sequences
+        or char == ZWJ
+    )
+
+
+def _is_regional_indicator(char: str) -> bool:
+    return 0x1F1E6 <= ord(char) <= 0x1F1FF
+
+
+def graphemes(text: str) -> List[str]:
+    """Split text into user-perceived characters.
+
+    Covers the cases that matter for posts: combining marks, emoji ZWJ
+    sequences, skin tones, variation selectors, keycaps, tag sequences,
+    flag pairs and CRLF.
+    """
+    clusters: List[str] = []
+    for char in text:
+        if clusters:
+            last = clusters[-1]
+            if (
+                _is_extend(char)
+                or last[-1] == ZWJ
+                or (last == '\r' and char == '\n')
+                or (_is_regional_indicator(char) and len(last) == 1 and _is_regional_indicator(last))
+            ):
+                clusters[-1] = last + char
+                continue
+        clusters.append(char)
+    return clusters
+
+
+def grapheme_len(text: str) -> int:
+    return len(graphemes(text))
+
+
+def truncate_graphemes(text: str, limit: int, ellipsis: str = '...') -> str:
+    """Cut text to ``limit`` graphemes, preferring a sentence end, then a word break"""
+    text = text.strip()
+    # Code points are an upper bound on graphemes, so short text needs no segmentation
+    if len(text) <= limit:
+        return text
+    clusters = graphemes(text)
+    if len(clusters) <= limit:
+        return text
+
+    head = ''.join(clusters[:limit])
+    sentence_ends = [m.end() for m in _SENTENCE_END_RE.finditer(head)]
+    if sentence_ends and sentence_ends[-1] >= len(head) // 2:
+        return head[:sentence_ends[-1]].rstrip()
+
+    room = ''.join(clusters[:max(0, limit - grapheme_len(ellipsis))])
+    space = room.rfind(' ')
+    if space >= len(room) // 2:
+        room = room[:space]
+    return room.rstrip() + ellipsis
+
+
+def fit_post(text: str, limit: int = 300) -> str:
+    """Shared post-length guard for every publishing path"""
+    return truncate_graphemes(text, limit)
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, strip handles, URLs and punctuation, collapse whitespace"""
+    text = unicodedata.normalize('NFKC', text or '').lower()
+    text = _URL_RE.sub(' ', _MENTION_RE.sub(' ', text))
+    text = _PUNCT_RE.sub(' ', text)
+    return _SPACE_RE.sub(' ', text).strip()
@@ -0,0 +1,77 @@
+import logging
+from typing import Dict, Optional
+
+from utils.cache import LRUCache
+
+logger = logging.getLogger("thread_resolver")
+
+
+class ThreadContextResolver:
+    """Builds parent / current post / replies for a notification from one thread fetch.
+
+    Reuse happens at the parent, not the mention: every mention has its own
+    URI, so fetched threads are not cached. Instead the posts seen in any
+    fetched thread (the post, its parent and its replies) go into a
+    short-TTL LRU keyed by URI+CID, and a later mention replying to one of
+    them is resolved without a network call. On that fast path the
+    notification stands in for the current post and ``replies`` is always
+    empty, which is what a just-created mention has anyway; the first
+    mention in a hot thread costs one fetch, its siblings none.
+    """
+
+    def __init__(self, api, maxsize: int = 1024, ttl: float = 120):
+        self.api = api
+        self.posts = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.fetches = 0
+
+    @staticmethod
+    def _parent_ref(record):
+        reply = getattr(record, 'reply', None)
+        return getattr(reply, 'parent', None)
+
+    def _remember(self, post):
+        if post is not None and getattr(post, 'uri', None):
+            self.posts.set((post.uri, post.cid), post)
+
+    async def fetch_thread(self, uri: str):
+        """Fetch a thread with its direct parent, remembering every post in it"""
+        response = await self.api.app.bsky.feed.get_post_thread({'uri': uri, 'parentHeight': 1, 'depth': 1})
+        self.fetches += 1
+        thread = response.thread
+        if not thread or not hasattr(thread, 'post'):
+            return None
+
+        self._remember(thread.post)
+        self._remember(getattr(getattr(thread, 'parent', None), 'post', None))
+        for reply in getattr(thread, 'replies', None) or []:
+            self._remember(getattr(reply, 'post', None))
+        return thread
+
+    async def resolve(self, notification) -> Optional[Dict]:
+        """Return {'post', 'parent', 'replies'} for a mention notification"""
+        parent_ref = self._parent_ref(notification.record)
+        if parent_ref is not None:
+            parent = self.posts.get((parent_ref.uri, parent_ref.cid))
+            if parent is not None:
+                return {'post': notification, 'parent': parent, 'replies': []}
+
+        thread = await self.fetch_thread(notification.uri)
+        if thread is None:
+            return None
+
+        parent = getattr(getattr(thread, 'parent', None), 'post', None)
+        if parent is None and parent_ref is not None:
+            # Parent may be blocked or not returned in the thread view
+            try:
+                response = await self.api.app.bsky.feed.get_posts({'uris': [parent_ref.uri]})
+                self.fetches += 1
+                parent = response.posts[0] if response.posts else None
+                self._remember(parent)
+            except Exception as e:
+                logger.error(f"Parent fetch error: {e}")
+
+        return {
+            'post': thread.post,
+            'parent': parent,
+            'replies': [reply for reply in getattr(thread, 'replies', None) or [] if hasattr(reply, 'post')]
+        }
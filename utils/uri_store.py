@@ -0,0 +1,89 @@
+import json
+import logging
+import sqlite3
+import time
+
+logger = logging.getLogger("uri_store")
+
+
+class ProcessedURIStore:
+    """SQLite-backed dedupe set for processed notification URIs.
+
+    Adds and removals are single indexed row writes, entries older than
+    ``ttl_days`` are evicted periodically, and nothing is held in memory,
+    so cost stays flat regardless of uptime.
+    """
+
+    EVICT_EVERY = 500
+
+    def __init__(self, path: str = 'processed_uris.db', ttl_days: float = 30,
+                 legacy_file: str = 'processed_uris.json'):
+        self.ttl = ttl_days * 86400
+        # Opened during startup on a worker thread, then used from the event loop
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS processed_uris (uri TEXT PRIMARY KEY, processed_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_processed_at ON processed_uris(processed_at)")
+        self.conn.commit()
+        self._writes = 0
+        self._import_legacy(legacy_file)
+        self.evict_expired()
+
+    def _import_legacy(self, legacy_file: str):
+        """One-time migration from the old JSON dump"""
+        if not legacy_file or len(self):
+            return
+        try:
+            with open(legacy_file, 'r') as f:
+                uris = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.error(f"Error reading legacy URIs: {e}")
+            return
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO processed_uris (uri, processed_at) VALUES (?, ?)",
+                ((uri, now) for uri in uris)
+            )
+        logger.info(f"Imported {len(uris)} processed URIs from {legacy_file}")
+
+    def __contains__(self, uri: str) -> bool:
+        row = self.conn.execute("SELECT 1 FROM processed_uris WHERE uri = ?", (uri,)).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM processed_uris").fetchone()[0]
+
+    def add(self, uri: str):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO processed_uris (uri, processed_at) VALUES (?, ?)",
+                (uri, time.time())
+            )
+        self._writes += 1
+        if self._writes % self.EVICT_EVERY == 0:
+            self.evict_expired()
+
+    def discard(self, uri: str):
+        with self.conn:
+            self.conn.execute("DELETE FROM processed_uris WHERE uri = ?", (uri,))
+
+    def evict_expired(self) -> int:
+        """Drop entries older than the TTL"""
+        if self.ttl <= 0:
+            return 0
+        with self.conn:
+            cursor = self.conn.execute(
+                "DELETE FROM processed_uris WHERE processed_at < ?", (time.time() - self.ttl,)
+            )
+        if cursor.rowcount:
+            logger.info(f"Evicted {cursor.rowcount} expired processed URIs")
+        return cursor.rowcount
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,143 @@
+import asyncio
+import logging
+import random
+import time
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger("write_batcher")
+
+_TID_ALPHABET = '234567abcdefghijklmnopqrstuvwxyz'
+
+
+class WriteRejected(Exception):
+    """The server rejected this write itself; retrying it unchanged will fail again"""
+
+
+class WriteBatcher:
+    """Collects repo writes and flushes them through com.atproto.repo.applyWrites.
+
+    Callers await ``create`` / ``delete`` and get the record URI back (or
+    None on failure; a write the server rejects on its own raises
+    ``WriteRejected``). Pending writes are flushed when ``batch_size`` is
+    reached or ``flush_interval`` seconds after the first queued write.
+    applyWrites is atomic, so a batch rejected for a bad record (a 4xx
+    other than auth or rate limiting) is bisected to pin the failure on
+    the writes that caused it. Transport, 5xx and 429 errors retry the
+    whole batch up to ``max_retries`` times; auth errors and exhausted
+    retries fail the whole batch.
+    """
+
+    def __init__(self, api, repo: str, batch_size: int = 50, flush_interval: float = 0.5,
+                 max_retries: int = 2, retry_delay: float = 1.0):
+        self.api = api
+        self.repo = repo
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._pending: List[Tuple[dict, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+        self._last_tid = 0
+        self._clock_id = random.randrange(1024)
+
+    def _next_tid(self) -> str:
+        """Timestamp identifier used as record key, so URIs are known before the flush"""
+        now = time.time_ns() // 1000
+        if now <= self._last_tid:
+            now = self._last_tid + 1
+        self._last_tid = now
+        value = (now << 10) | self._clock_id
+        return ''.join(_TID_ALPHABET[(value >> (5 * i)) & 31] for i in reversed(range(13)))
+
+    def _uri(self, write: dict) -> str:
+        return f"at://{self.repo}/{write['collection']}/{write['rkey']}"
+
+    async def create(self, collection: str, record: dict) -> Optional[str]:
+        return await self._submit({
+            '$type': 'com.atproto.repo.applyWrites#create',
+            'collection': collection,
+            'rkey': self._next_tid(),
+            'value': record
+        })
+
+    async def delete(self, collection: str, rkey: str) -> Optional[str]:
+        return await self._submit({
+            '$type': 'com.atproto.repo.applyWrites#delete',
+            'collection': collection,
+            'rkey': rkey
+        })
+
+    async def _submit(self, write: dict) -> Optional[str]:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((write, future))
+        if len(self._pending) >= self.batch_size:
+            self._spawn_flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.flush_interval, self._spawn_flush)
+        return await future
+
+    def _spawn_flush(self):
+        task = asyncio.create_task(self.flush())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def flush(self):
+        """Send all pending writes in batch_size chunks"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            batch = self._pending[:self.batch_size]
+            del self._pending[:self.batch_size]
+            await self._apply(batch)
+
+    @staticmethod
+    def _status(error: Exception) -> Optional[int]:
+        return getattr(getattr(error, 'response', None), 'status_code', None)
+
+    @classmethod
+    def _is_record_error(cls, error: Exception) -> bool:
+        """The server rejected the batch's content rather than the request"""
+        status = cls._status(error)
+        return status is not None and 400 <= status < 500 and status not in (401, 403, 429)
+
+    @classmethod
+    def _is_transient(cls, error: Exception) -> bool:
+        status = cls._status(error)
+        return status is None or status == 429 or status >= 500
+
+    def _resolve(self, batch: List[Tuple[dict, asyncio.Future]], uris: bool):
+        for write, future in batch:
+            if not future.done():
+                future.set_result(self._uri(write) if uris else None)
+
+    async def _apply(self, batch: List[Tuple[dict, asyncio.Future]]):
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self.api.com.atproto.repo.apply_writes({
+                    'repo': self.repo,
+                    'writes': [write for write, _ in batch]
+                })
+                break
+            except Exception as e:
+                if self._is_record_error(e):
+                    if len(batch) == 1:
+                        write, future = batch[0]
+                        logger.error(f"Write rejected for {write['collection']}/{write['rkey']}: {e}")
+                        if not future.done():
+                            future.set_exception(WriteRejected(str(e)))
+                        return
+                    mid = len(batch) // 2
+                    await self._apply(batch[:mid])
+                    await self._apply(batch[mid:])
+                    return
+                if not self._is_transient(e) or attempt == self.max_retries:
+                    logger.error(f"Batch of {len(batch)} repo writes failed: {e}")
+                    self._resolve(batch, uris=False)
+                    return
+                logger.warning(f"applyWrites failed ({e}); retrying batch of {len(batch)}")
+                await asyncio.sleep(self.retry_delay * 2 ** attempt)
+
+        self._resolve(batch, uris=True)
+        logger.info(f"Applied {len(batch)} repo writes")